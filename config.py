@@ -52,6 +52,13 @@ class Config:
     MAX_PENDING_BOOKINGS = 3
     BOOKING_ADVANCE_HOURS = 2
     OWNER_RESPONSE_HOURS = 24
+    
+    # Raise on lazy loads in report queries so a missed eager load shows up as an error, not N+1
+    # (create_app always loads the base Config, so enable it with REPORT_RAISELOAD=true in development/tests)
+    REPORT_RAISELOAD = os.environ.get('REPORT_RAISELOAD', 'false').lower() == 'true'
+    
+    # Run independent report queries on separate connections (uses one pool slot per query)
+    REPORT_PARALLEL_QUERIES = os.environ.get('REPORT_PARALLEL_QUERIES', 'false').lower() == 'true'
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -0,0 +1,37 @@
+"""add composite indexes for booking and message lookups
+
+Revision ID: 5b2e8c41d7a9
+Revises: 773c9ea1de7a
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8c41d7a9'
+down_revision = '773c9ea1de7a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_court_date_status', ['court_id', 'booking_date', 'status'], unique=False)
+        batch_op.create_index('ix_booking_court_created', ['court_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_message_pair_time', ['sender_id', 'receiver_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_message_unread_receiver', ['receiver_id', 'sender_id'], unique=False,
+                              postgresql_where=sa.text('is_read = false'))
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_unread_receiver')
+        batch_op.drop_index('ix_message_pair_time')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_court_created')
+        batch_op.drop_index('ix_booking_court_date_status')
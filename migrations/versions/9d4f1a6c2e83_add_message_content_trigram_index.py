@@ -0,0 +1,33 @@
+"""add trigram index on message content
+
+Revision ID: 9d4f1a6c2e83
+Revises: 5b2e8c41d7a9
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f1a6c2e83'
+down_revision = '5b2e8c41d7a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm lets PostgreSQL serve '%term%' ILIKE searches from an index; other databases keep the plain scan
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_message_content_trgm', 'messages', ['content'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_message_content_trgm', table_name='messages')
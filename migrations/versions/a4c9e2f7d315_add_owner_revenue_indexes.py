@@ -0,0 +1,26 @@
+"""add indexes for owner revenue aggregates
+
+Revision ID: a4c9e2f7d315
+Revises: f2a8d6e4b1c7
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c9e2f7d315'
+down_revision = 'f2a8d6e4b1c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.create_index('ix_court_owner', ['owner_id'], unique=False, postgresql_include=['hourly_rate'])
+
+
+def downgrade():
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.drop_index('ix_court_owner')
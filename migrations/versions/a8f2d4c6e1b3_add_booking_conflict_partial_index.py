@@ -0,0 +1,27 @@
+"""add partial index for booking conflict checks
+
+Revision ID: a8f2d4c6e1b3
+Revises: f3c1a8e5b2d7
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8f2d4c6e1b3'
+down_revision = 'f3c1a8e5b2d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_conflict', ['court_id', 'booking_date', 'start_time', 'end_time'],
+                              unique=False, postgresql_where=sa.text("status IN ('confirmed', 'pending')"))
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_conflict')
@@ -0,0 +1,38 @@
+"""add indexes for report date-range filters
+
+Revision ID: c3a7e5f90b12
+Revises: 9d4f1a6c2e83
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7e5f90b12'
+down_revision = '9d4f1a6c2e83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_status_date', ['status', 'booking_date'], unique=False)
+        batch_op.create_index('ix_booking_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_booking_player_created', ['player_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_msg_sender_created', ['sender_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_msg_receiver_created', ['receiver_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_msg_receiver_created')
+        batch_op.drop_index('ix_msg_sender_created')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_player_created')
+        batch_op.drop_index('ix_booking_created_at')
+        batch_op.drop_index('ix_booking_status_date')
@@ -0,0 +1,45 @@
+"""add stored players.skill_rank
+
+Revision ID: d5e8a2c6f914
+Revises: a4c9e2f7d315
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e8a2c6f914'
+down_revision = 'a4c9e2f7d315'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_rank', sa.SmallInteger(), nullable=True))
+        batch_op.create_index('ix_players_skill_rank', ['skill_rank'], unique=False)
+
+    players = sa.table(
+        'players',
+        sa.column('skill_level', sa.String),
+        sa.column('skill_rank', sa.SmallInteger)
+    )
+    op.execute(
+        players.update().values(
+            skill_rank=sa.case(
+                (players.c.skill_level == 'beginner', 1),
+                (players.c.skill_level == 'intermediate', 2),
+                (players.c.skill_level == 'advanced', 3),
+                (players.c.skill_level == 'professional', 4),
+                else_=None
+            )
+        )
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_skill_rank')
+        batch_op.drop_column('skill_rank')
@@ -0,0 +1,55 @@
+"""backfill bookings.total_cost for rows created without it
+
+Revision ID: e1f4b7c2a9d3
+Revises: c3a7e5f90b12
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f4b7c2a9d3'
+down_revision = 'c3a7e5f90b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    bookings = sa.table(
+        'bookings',
+        sa.column('id', sa.Integer),
+        sa.column('court_id', sa.Integer),
+        sa.column('start_time', sa.Time),
+        sa.column('end_time', sa.Time),
+        sa.column('total_cost', sa.Float)
+    )
+    courts = sa.table(
+        'courts',
+        sa.column('id', sa.Integer),
+        sa.column('hourly_rate', sa.Float)
+    )
+
+    # Durations are computed in Python so the same migration works on SQLite and PostgreSQL
+    rows = bind.execute(
+        sa.select(bookings.c.id, bookings.c.start_time, bookings.c.end_time, courts.c.hourly_rate)
+        .select_from(bookings.join(courts, courts.c.id == bookings.c.court_id))
+        .where(sa.or_(bookings.c.total_cost.is_(None), bookings.c.total_cost == 0))
+    ).fetchall()
+
+    for booking_id, start_time, end_time, hourly_rate in rows:
+        duration = datetime.combine(date.today(), end_time) - datetime.combine(date.today(), start_time)
+        bind.execute(
+            bookings.update()
+            .where(bookings.c.id == booking_id)
+            .values(total_cost=hourly_rate * duration.total_seconds() / 3600)
+        )
+
+
+def downgrade():
+    # Backfilled costs are indistinguishable from stored ones; nothing to undo
+    pass
@@ -0,0 +1,26 @@
+"""add index for court duplicate-name checks
+
+Revision ID: e9b4c7d2a6f1
+Revises: d5e8a2c6f914
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c7d2a6f1'
+down_revision = 'd5e8a2c6f914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.create_index('ix_court_owner_name', ['owner_id', 'name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courts', schema=None) as batch_op:
+        batch_op.drop_index('ix_court_owner_name')
@@ -0,0 +1,50 @@
+"""add stored bookings.duration_hours
+
+Revision ID: f2a8d6e4b1c7
+Revises: e1f4b7c2a9d3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8d6e4b1c7'
+down_revision = 'e1f4b7c2a9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duration_hours', sa.Float(), nullable=True))
+
+    bind = op.get_bind()
+    bookings = sa.table(
+        'bookings',
+        sa.column('id', sa.Integer),
+        sa.column('start_time', sa.Time),
+        sa.column('end_time', sa.Time),
+        sa.column('duration_hours', sa.Float)
+    )
+
+    # Durations are computed in Python so the same migration works on SQLite and PostgreSQL
+    rows = bind.execute(
+        sa.select(bookings.c.id, bookings.c.start_time, bookings.c.end_time)
+    ).fetchall()
+
+    for booking_id, start_time, end_time in rows:
+        duration = datetime.combine(date.today(), end_time) - datetime.combine(date.today(), start_time)
+        bind.execute(
+            bookings.update()
+            .where(bookings.c.id == booking_id)
+            .values(duration_hours=duration.total_seconds() / 3600)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_column('duration_hours')
@@ -1,9 +1,16 @@
 from models.database import db
 from datetime import datetime, date, time
+from sqlalchemy import event, inspect, select
 
 class Court(db.Model):
     """Court model for tennis courts"""
     __tablename__ = 'courts'
+    __table_args__ = (
+        # Owner revenue queries join Booking -> Court by owner; INCLUDE lets PostgreSQL read the rate from the index
+        db.Index('ix_court_owner', 'owner_id', postgresql_include=['hourly_rate']),
+        # Duplicate-name check on court creation
+        db.Index('ix_court_owner_name', 'owner_id', 'name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -174,6 +181,26 @@ class Court(db.Model):
 class Booking(db.Model):
     """Booking model for court reservations"""
     __tablename__ = 'bookings'
+    # On PostgreSQL the bookings_no_overlap EXCLUDE constraint also rejects overlapping
+    # pending/confirmed bookings on the same court (see migration f3c1a8e5b2d7)
+    NO_OVERLAP_CONSTRAINT = 'bookings_no_overlap'
+    # Bootstrap badge color per booking status
+    STATUS_COLORS = {
+        'pending': 'warning',
+        'confirmed': 'success',
+        'cancelled': 'danger',
+        'rejected': 'secondary'
+    }
+    __table_args__ = (
+        db.Index('ix_booking_court_date_status', 'court_id', 'booking_date', 'status'),
+        # Partial index for the booking-conflict probe, which only considers active bookings (PostgreSQL only)
+        db.Index('ix_booking_conflict', 'court_id', 'booking_date', 'start_time', 'end_time',
+                 postgresql_where=db.text("status IN ('confirmed', 'pending')")),
+        db.Index('ix_booking_court_created', 'court_id', 'created_at'),
+        db.Index('ix_booking_status_date', 'status', 'booking_date'),
+        db.Index('ix_booking_created_at', 'created_at'),
+        db.Index('ix_booking_player_created', 'player_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     court_id = db.Column(db.Integer, db.ForeignKey('courts.id'), nullable=False)
@@ -184,6 +211,7 @@ class Booking(db.Model):
     status = db.Column(db.String(20), default='pending', nullable=False)  # pending, confirmed, cancelled, rejected
     notes = db.Column(db.Text, nullable=True)
     total_cost = db.Column(db.Float, nullable=True)
+    duration_hours = db.Column(db.Float, nullable=True)  # Stored on flush so reports never recompute it per row
     payment_status = db.Column(db.String(20), default='pending', nullable=False)  # pending, paid, refunded
     cancellation_reason = db.Column(db.Text, nullable=True)
     rejection_reason = db.Column(db.Text, nullable=True)
@@ -240,15 +268,14 @@ class Booking(db.Model):
         }
         return status_mapping.get(self.status, self.status.title())
     
+    @staticmethod
+    def color_for_status(status):
+        """Get color class for a status value (usable on column-only rows)"""
+        return Booking.STATUS_COLORS.get(status, 'secondary')
+    
     def get_status_color(self):
         """Get color class for status"""
-        color_mapping = {
-            'pending': 'warning',
-            'confirmed': 'success',
-            'cancelled': 'danger',
-            'rejected': 'secondary'
-        }
-        return color_mapping.get(self.status, 'secondary')
+        return Booking.color_for_status(self.status)
     
     def can_cancel(self, user_id, user_type):
         """Check if booking can be cancelled by user"""
@@ -295,4 +322,34 @@ class Booking(db.Model):
         }
     
     def __repr__(self):
-        return f'<Booking {self.id}: {self.court.name if self.court else "Unknown Court"} on {self.booking_date}>'
\ No newline at end of file
+        return f'<Booking {self.id}: {self.court.name if self.court else "Unknown Court"} on {self.booking_date}>'
+
+
+@event.listens_for(Booking, 'before_insert')
+@event.listens_for(Booking, 'before_update')
+def _persist_booking_derived_values(mapper, connection, target):
+    """Keep duration_hours and total_cost stored so revenue reports can aggregate plain columns"""
+    state = inspect(target)
+    schedule_changed = any(
+        state.attrs[key].history.has_changes() for key in ('court_id', 'start_time', 'end_time')
+    )
+    
+    if target.duration_hours is None or schedule_changed:
+        start_datetime = datetime.combine(date.today(), target.start_time)
+        end_datetime = datetime.combine(date.today(), target.end_time)
+        target.duration_hours = (end_datetime - start_datetime).total_seconds() / 3600
+    
+    cost_set_explicitly = state.attrs.total_cost.history.has_changes()
+    if target.total_cost is not None and (cost_set_explicitly or not schedule_changed):
+        return
+    
+    # Use the loaded court when available, otherwise read the rate on the flush connection
+    court = target.__dict__.get('court')
+    if court is not None and court.id == target.court_id:
+        hourly_rate = court.hourly_rate
+    else:
+        hourly_rate = connection.scalar(
+            select(Court.hourly_rate).where(Court.id == target.court_id)
+        )
+    if hourly_rate is not None:
+        target.total_cost = hourly_rate * target.duration_hours
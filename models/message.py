@@ -4,6 +4,15 @@ from datetime import datetime
 class Message(db.Model):
     """Message model for user communications"""
     __tablename__ = 'messages'
+    __table_args__ = (
+        db.Index('ix_message_pair_time', 'sender_id', 'receiver_id', 'created_at'),
+        # Per-sender time scans (message rate limit, report windows); pair_time cannot order by created_at here
+        db.Index('ix_msg_sender_created', 'sender_id', 'created_at'),
+        db.Index('ix_msg_receiver_created', 'receiver_id', 'created_at'),
+        # Partial index for the unread-count hot path (PostgreSQL only)
+        db.Index('ix_message_unread_receiver', 'receiver_id', 'sender_id',
+                 postgresql_where=db.text('is_read = false')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -120,29 +129,36 @@ class Message(db.Model):
         ).order_by(Message.created_at.asc()).all()
     
     @staticmethod
-    def get_user_conversations(user_id):
-        """Get all conversations for a user"""
-        # Get all messages involving the user
-        messages = Message.query.filter(
+    def get_user_conversations(user_id, limit=None):
+        """Get all conversations for a user with active partners, newest first"""
+        from models.user import User
+        
+        # Latest message id per conversation partner
+        partner_id = db.case((Message.sender_id == user_id, Message.receiver_id),
+                             else_=Message.sender_id)
+        latest = db.session.query(
+            partner_id.label('partner_id'),
+            db.func.max(Message.id).label('last_id')
+        ).filter(
             db.or_(Message.sender_id == user_id, Message.receiver_id == user_id)
-        ).order_by(Message.created_at.desc()).all()
+        ).group_by(partner_id).subquery()
         
-        # Extract unique conversation partners
-        partners = {}
-        for msg in messages:
-            partner_id = msg.receiver_id if msg.sender_id == user_id else msg.sender_id
-            if partner_id not in partners:
-                partners[partner_id] = {
-                    'partner_id': partner_id,
-                    'last_message_time': msg.created_at,
-                    'last_message': msg
-                }
+        # Skip partners whose accounts are missing or deactivated
+        query = db.session.query(Message, User).join(
+            latest, Message.id == latest.c.last_id
+        ).join(
+            User, db.and_(User.id == latest.c.partner_id, User.is_active == True)
+        ).order_by(Message.created_at.desc())
         
-        # Convert to list and sort by last message time
-        conversations = list(partners.values())
-        conversations.sort(key=lambda x: x['last_message_time'], reverse=True)
+        if limit:
+            query = query.limit(limit)
         
-        return conversations
+        return [{
+            'partner_id': partner.id,
+            'partner': partner,
+            'last_message_time': message.created_at,
+            'last_message': message
+        } for message, partner in query.all()]
     
     @staticmethod
     def count_unread_messages(user_id):
@@ -154,16 +170,17 @@ class Message(db.Model):
     
     @staticmethod
     def mark_conversation_as_read(user_id, other_user_id):
-        """Mark all messages in a conversation as read"""
-        Message.query.filter(
+        """Mark all messages in a conversation as read, returning how many were updated"""
+        marked_count = Message.query.filter(
             Message.sender_id == other_user_id,
             Message.receiver_id == user_id,
             Message.is_read == False
         ).update({
             'is_read': True,
             'read_at': datetime.utcnow()
-        })
+        }, synchronize_session=False)
         db.session.commit()
+        return marked_count
     
     def __repr__(self):
         sender_name = self.sender.full_name if self.sender else "Unknown"
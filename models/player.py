@@ -1,5 +1,9 @@
 from models.database import db
 from datetime import datetime
+from sqlalchemy import event
+
+# Numeric order of skill levels, stored as Player.skill_rank for SQL comparisons
+SKILL_LEVEL_RANKS = {'beginner': 1, 'intermediate': 2, 'advanced': 3, 'professional': 4}
 
 class Player(db.Model):
     """Player profile model for tennis players"""
@@ -8,6 +12,7 @@ class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
     skill_level = db.Column(db.String(20), nullable=False)  # beginner, intermediate, advanced, professional
+    skill_rank = db.Column(db.SmallInteger, nullable=True, index=True)  # 1-4, derived from skill_level on flush
     preferred_location = db.Column(db.String(100), nullable=True)
     availability = db.Column(db.String(50), nullable=True)  # weekdays, weekends, evenings, flexible
     bio = db.Column(db.Text, nullable=True)
@@ -131,4 +136,11 @@ class Player(db.Model):
         }
     
     def __repr__(self):
-        return f'<Player {self.user.full_name if self.user else "Unknown"} ({self.skill_level})>'
\ No newline at end of file
+        return f'<Player {self.user.full_name if self.user else "Unknown"} ({self.skill_level})>'
+
+
+@event.listens_for(Player, 'before_insert')
+@event.listens_for(Player, 'before_update')
+def _persist_player_skill_rank(mapper, connection, target):
+    """Keep skill_rank in step with skill_level so matching can compare levels in SQL"""
+    target.skill_rank = SKILL_LEVEL_RANKS.get(target.skill_level)
@@ -12,6 +12,7 @@ from models.database import db
 from utils.decorators import login_required, admin_required
 from services.report_service import ReportService
 from services.rule_engine import RuleEngine
+from services.messaging_service import MessagingService
 from datetime import datetime, timedelta
 from sqlalchemy import func
 
@@ -160,6 +161,7 @@ def toggle_user_status(user_id):
     action = "activated" if user.is_active else "deactivated"
     
     db.session.commit()
+    RuleEngine.invalidate_user_status(user.id)
     
     flash(f'User {user.full_name} has been {action}', 'success')
     return redirect(url_for('admin.user_detail', user_id=user_id))
@@ -356,6 +358,7 @@ def broadcast_message():
             message_count += 1
         
         db.session.commit()
+        MessagingService.invalidate_unread_count(*[recipient.id for recipient in recipients])
         
         flash(f'Broadcast message sent to {message_count} users', 'success')
         return redirect(url_for('admin.dashboard'))
@@ -17,6 +17,7 @@ from services.report_service import ReportService
 from services.matching_engine import MatchingEngine
 from services.shared_booking_service import SharedBookingService
 from services.rule_engine import RuleEngine
+from services.messaging_service import MessagingService
 from datetime import datetime, timedelta
 import json
 
@@ -659,6 +660,7 @@ def mark_notification_read(message_id):
         
         message.is_read = True
         db.session.commit()
+        MessagingService.invalidate_unread_count(user_id)
         
         return jsonify({
             'success': True,
@@ -848,8 +850,6 @@ def send_message():
             return jsonify({'success': False, 'error': 'Receiver and content required'}), 400
         
         # Use MessagingService for sending
-        from services.messaging_service import MessagingService
-        
         result = MessagingService.send_message(
             sender_id=user_id,
             receiver_id=receiver_id,
@@ -881,10 +881,10 @@ def mark_conversation_read(other_user_id):
     try:
         user_id = session['user_id']
         
-        # Mark conversation as read
-        Message.mark_conversation_as_read(user_id, other_user_id)
+        # Mark conversation as read (the service also updates the cached unread count)
+        result = MessagingService.mark_conversation_as_read(user_id, other_user_id)
         
-        return jsonify({'success': True})
+        return jsonify({'success': result['success']})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -4,6 +4,7 @@ from models.user import User
 from models.player import Player
 from services.rule_engine import RuleEngine
 from services.email_service import EmailService
+from services.report_service import ReportService
 from utils.helpers import validate_email, validate_phone
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -151,6 +152,7 @@ def register():
                 db.session.add(player)
             
             db.session.commit()
+            ReportService.invalidate_report_caches()
             
             # Send welcome email
             try:
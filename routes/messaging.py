@@ -51,8 +51,8 @@ def conversation(other_user_id):
         messages = Message.get_conversation_messages(user_id, other_user_id)
         logger.debug(f"Found {len(messages)} messages")
         
-        # Mark messages from other user as read
-        Message.mark_conversation_as_read(user_id, other_user_id)
+        # Mark messages from other user as read (through the service so the unread badge stays in sync)
+        MessagingService.mark_conversation_as_read(user_id, other_user_id)
         
         # Add sender information to messages for template
         for message in messages:
@@ -277,13 +277,15 @@ def api_conversation_messages(other_user_id):
     user_id = session['user_id']
     page = request.args.get('page', 1, type=int)
     since_id = request.args.get('since_id', type=int)  # For getting new messages only
+    before_id = request.args.get('before_id', type=int)  # Keyset cursor for older messages
     
     try:
         conversation_data = MessagingService.get_conversation_messages(
             user_id=user_id,
             other_user_id=other_user_id,
             page=page,
-            per_page=50
+            per_page=50,
+            before_id=before_id
         )
         
         # If since_id provided, filter for newer messages only
@@ -298,7 +300,8 @@ def api_conversation_messages(other_user_id):
             'messages': conversation_data['messages'],
             'has_next': conversation_data['has_next'],
             'has_prev': conversation_data['has_prev'],
-            'total': conversation_data['total']
+            'total': conversation_data['total'],
+            'next_before_id': conversation_data['next_before_id']
         })
         
     except Exception as e:
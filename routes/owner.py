@@ -187,6 +187,8 @@ def edit_court(court_id):
                 flash('Court updated successfully!', 'success')
             
             db.session.commit()
+            # Closed-month revenue is rate * duration, so a rate change retires the cached months
+            RevenueService.invalidate_owner_revenue(user_id)
             return redirect(url_for('owner.manage_courts'))
             
         except Exception as e:
@@ -526,6 +528,7 @@ def delete_court(court_id):
         
         db.session.delete(court)
         db.session.commit()
+        RevenueService.invalidate_owner_revenue(user_id)
         flash(f'Court "{court_name}" has been deleted successfully', 'success')
     except Exception as e:
         db.session.rollback()
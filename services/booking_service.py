@@ -10,8 +10,17 @@ from models.court import Court, Booking
 from models.message import Message
 from services.rule_engine import RuleEngine
 from services.email_service import EmailService
+from services.matching_engine import MatchingEngine
+from services.messaging_service import MessagingService
+from services.report_service import ReportService
+from services.revenue_service import RevenueService, WEEKDAY_NAMES
 from sqlalchemy import and_, or_, func
+from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class BookingService:
@@ -26,15 +35,9 @@ class BookingService:
                 return {'success': False, 'error': 'Court not found'}
             
             # Parse time strings if needed
-            if isinstance(start_time, str):
-                start_dt = datetime.strptime(start_time, '%H:%M')
-            else:
-                start_dt = datetime.combine(datetime.today(), start_time)
-                
-            if isinstance(end_time, str):
-                end_dt = datetime.strptime(end_time, '%H:%M')
-            else:
-                end_dt = datetime.combine(datetime.today(), end_time)
+            today = date.today()
+            start_dt = datetime.combine(today, RuleEngine.parse_time(start_time))
+            end_dt = datetime.combine(today, RuleEngine.parse_time(end_time))
             
             duration_hours = (end_dt - start_dt).total_seconds() / 3600
             total_cost = duration_hours * court.hourly_rate
@@ -55,12 +58,9 @@ class BookingService:
         """Validate if booking time slot is available"""
         try:
             # Convert strings to proper types
-            if isinstance(booking_date, str):
-                booking_date = datetime.strptime(booking_date, '%Y-%m-%d').date()
-            if isinstance(start_time, str):
-                start_time = datetime.strptime(start_time, '%H:%M').time()
-            if isinstance(end_time, str):
-                end_time = datetime.strptime(end_time, '%H:%M').time()
+            booking_date = RuleEngine.parse_date(booking_date)
+            start_time = RuleEngine.parse_time(start_time)
+            end_time = RuleEngine.parse_time(end_time)
             
             # Use RuleEngine for validation - עם player_id
             validation = RuleEngine.validate_booking(
@@ -91,12 +91,9 @@ class BookingService:
                 return {'success': False, 'error': cost_result['error']}
             
             # Convert strings to proper types
-            if isinstance(booking_date, str):
-                booking_date = datetime.strptime(booking_date, '%Y-%m-%d').date()
-            if isinstance(start_time, str):
-                start_time = datetime.strptime(start_time, '%H:%M').time()
-            if isinstance(end_time, str):
-                end_time = datetime.strptime(end_time, '%H:%M').time()
+            booking_date = RuleEngine.parse_date(booking_date)
+            start_time = RuleEngine.parse_time(start_time)
+            end_time = RuleEngine.parse_time(end_time)
             
             # Create booking
             booking = Booking(
@@ -112,7 +109,15 @@ class BookingService:
             booking.total_cost = cost_result['total_cost']
             
             db.session.add(booking)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError as e:
+                # A concurrent request took the slot between validation and INSERT
+                db.session.rollback()
+                if BookingService._is_overlap_violation(e):
+                    return {'success': False, 'error': 'Time slot conflicts with an existing booking'}
+                raise
+            BookingService._invalidate_booking_caches(booking, player_activity=True)
             
             # Send notification (async/background task would be better)
             try:
@@ -131,6 +136,29 @@ class BookingService:
             db.session.rollback()
             return {'success': False, 'error': f'Booking failed: {str(e)}'}
     
+    @staticmethod
+    def _invalidate_booking_caches(booking, player_activity=False, monthly_revenue=False):
+        """Drop caches derived from a committed booking write
+        
+        The write is already committed, so a cache failure is logged instead of failing the request.
+        """
+        try:
+            owner_id = booking.court.owner_id
+            MatchingEngine.invalidate_court_stats(booking.court_id, owner_id)
+            if player_activity:
+                MatchingEngine.invalidate_activity_stats(booking.player_id)
+            ReportService.invalidate_report_caches()
+            if monthly_revenue:
+                RevenueService.invalidate_monthly_revenue(owner_id, booking.booking_date)
+        except Exception as e:
+            logger.error(f"Cache invalidation failed for booking {booking.id}: {str(e)}")
+    
+    @staticmethod
+    def _is_overlap_violation(error):
+        """True when an IntegrityError comes from the PostgreSQL no-overlap exclusion constraint"""
+        diag = getattr(error.orig, 'diag', None)
+        return getattr(diag, 'constraint_name', None) == Booking.NO_OVERLAP_CONSTRAINT
+    
     @staticmethod
     def get_booking_details(booking_id):
         """Get comprehensive booking details"""
@@ -232,6 +260,7 @@ class BookingService:
                 booking.rejection_reason = reason
             
             db.session.commit()
+            BookingService._invalidate_booking_caches(booking, monthly_revenue=True)
             
             # Send status change notification
             try:
@@ -328,53 +357,57 @@ class BookingService:
         try:
             start_date = datetime.now() - timedelta(days=period_days)
             
+            # Only the columns the statistics need, streamed in batches
+            query = db.session.query(
+                Booking.status, Booking.total_cost, Booking.start_time, Booking.booking_date
+            )
             if user_type == 'player':
-                query = db.session.query(Booking).filter(
+                query = query.filter(
                     Booking.player_id == user_id,
                     Booking.created_at >= start_date
                 )
             elif user_type == 'owner':
-                query = db.session.query(Booking).join(Court).filter(
+                query = query.join(Court).filter(
                     Court.owner_id == user_id,
                     Booking.created_at >= start_date
                 )
             else:  # admin
-                query = db.session.query(Booking).filter(
+                query = query.filter(
                     Booking.created_at >= start_date
                 )
             
-            bookings = query.all()
+            # Calculate statistics in a single pass
+            status_counts = defaultdict(int)
+            total_revenue = 0
+            time_counts = {}
+            day_counts = {}
+            for booking in query.yield_per(1000):
+                status_counts[booking.status] += 1
+                if booking.status == 'confirmed':
+                    total_revenue += booking.total_cost or 0
+                    hour = booking.start_time.hour
+                    time_counts[hour] = time_counts.get(hour, 0) + 1
+                    day_name = WEEKDAY_NAMES[booking.booking_date.weekday()]
+                    day_counts[day_name] = day_counts.get(day_name, 0) + 1
             
-            # Calculate statistics
             stats = {
-                'total_bookings': len(bookings),
-                'confirmed': len([b for b in bookings if b.status == 'confirmed']),
-                'pending': len([b for b in bookings if b.status == 'pending']),
-                'cancelled': len([b for b in bookings if b.status == 'cancelled']),
-                'total_revenue': sum(b.total_cost or b.calculate_cost() for b in bookings if b.status == 'confirmed'),
+                'total_bookings': sum(status_counts.values()),
+                'confirmed': status_counts['confirmed'],
+                'pending': status_counts['pending'],
+                'cancelled': status_counts['cancelled'],
+                'total_revenue': total_revenue,
                 'avg_booking_value': 0,
                 'popular_times': {},
                 'busy_days': {}
             }
             
             if stats['confirmed'] > 0:
-                confirmed_bookings = [b for b in bookings if b.status == 'confirmed']
                 stats['avg_booking_value'] = stats['total_revenue'] / stats['confirmed']
                 
                 # Popular times analysis
-                time_counts = {}
-                for booking in confirmed_bookings:
-                    hour = booking.start_time.hour
-                    time_counts[hour] = time_counts.get(hour, 0) + 1
-                
                 stats['popular_times'] = dict(sorted(time_counts.items(), key=lambda x: x[1], reverse=True)[:5])
                 
                 # Busy days analysis
-                day_counts = {}
-                for booking in confirmed_bookings:
-                    day_name = booking.booking_date.strftime('%A')
-                    day_counts[day_name] = day_counts.get(day_name, 0) + 1
-                
                 stats['busy_days'] = dict(sorted(day_counts.items(), key=lambda x: x[1], reverse=True)[:3])
             
             return {
@@ -415,6 +448,7 @@ Please review and approve this booking request.
             
             db.session.add(notification)
             db.session.commit()
+            MessagingService.invalidate_unread_count(owner.id)
             
             # Try to send email notification
             try:
@@ -458,6 +492,7 @@ Court: {booking.court.name}
             
             db.session.add(notification)
             db.session.commit()
+            MessagingService.invalidate_unread_count(booking.player.user_id)
             
         except Exception as e:
             # Don't fail the status update if notification fails
@@ -2,7 +2,7 @@
 Calendar Service for TennisMatchUp
 Handles calendar integration and scheduling functionality
 """
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, time
 from models.database import db
 from models.court import Court, Booking
 from models.player import Player
@@ -101,7 +101,7 @@ class CalendarService:
         # Generate hourly time slots
         time_slots = []
         for hour in range(6, 22):  # 6 AM to 9 PM
-            slot_time = datetime.strptime(f'{hour}:00', '%H:%M').time()
+            slot_time = time(hour)
             
             # Find bookings for this time slot
             slot_bookings = []
@@ -223,8 +223,8 @@ class CalendarService:
             
             # Find free slots (simplified - checking hourly slots)
             for hour in range(8, 21):  # 8 AM to 8 PM
-                slot_start = datetime.strptime(f'{hour}:00', '%H:%M').time()
-                slot_end = datetime.strptime(f'{hour + 1}:00', '%H:%M').time()
+                slot_start = time(hour)
+                slot_end = time(hour + 1)
                 
                 # Check if both players are free
                 p1_free = not any(b.start_time <= slot_start < b.end_time for b in p1_day_bookings)
@@ -301,7 +301,7 @@ class CalendarService:
             new_start_hour = preferred_start.hour + hour_offset
             
             if 6 <= new_start_hour <= 20:  # Within business hours
-                new_start = datetime.strptime(f'{new_start_hour}:00', '%H:%M').time()
+                new_start = time(new_start_hour)
                 new_end = (datetime.combine(date.today(), new_start) + 
                           timedelta(hours=duration)).time()
                 
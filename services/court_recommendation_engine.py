@@ -11,7 +11,15 @@ from models.user import User
 from services.geo_service import GeoService
 from services.rule_engine import RuleEngine
 from sqlalchemy import func, and_, or_
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
+from bisect import bisect_left
+import heapq
+
+# Step-function scoring tables: score = POINTS[bisect_left(BINS, value)]
+_DISTANCE_BINS = (5, 10, 20)
+_DISTANCE_POINTS = (25, 20, 15)
+_PRICE_RATIO_BINS = (0.8, 1.0, 1.2)
+_PRICE_RATIO_POINTS = (15, 10, 5, 0)
 
 class CourtRecommendationEngine:
     """Intelligent court recommendation system with geographic precision"""
@@ -40,7 +48,11 @@ class CourtRecommendationEngine:
             db.session.commit()
         
         # Build base query for active courts
-        query = Court.query.options(joinedload(Court.bookings)).filter(
+        # Owners load in one extra SELECT instead of lazily per court
+        query = Court.query.options(
+            joinedload(Court.bookings),
+            selectinload(Court.owner)
+        ).filter(
             Court.is_active == True
         )
         
@@ -55,10 +67,23 @@ class CourtRecommendationEngine:
         scored_courts = []
         player_coords = player.get_coordinates()
         
-        for court in potential_courts:
+        # Distances to every court in one batch
+        distances = GeoService.calculate_distances_km(
+            player_coords,
+            [(court.latitude, court.longitude) if court.latitude and court.longitude else None
+             for court in potential_courts]
+        )
+        
+        # Market average price is shared by every court's value score
+        avg_price = CourtRecommendationEngine._get_average_price()
+        
+        # Normalize the player's location once instead of per court
+        preferred_location = (player.preferred_location or '').lower()
+        
+        for court, distance_km in zip(potential_courts, distances):
             # Calculate recommendation score
             score_data = CourtRecommendationEngine._calculate_court_score(
-                player, court, player_coords, filters
+                player, court, distance_km, filters, avg_price, preferred_location
             )
             
             # Skip courts with very low scores unless showing all
@@ -76,10 +101,8 @@ class CourtRecommendationEngine:
             })
         
         # Sort courts based on criteria
-        sorted_courts = CourtRecommendationEngine._sort_courts(scored_courts, sort_by)
-        
-        # Return limited results
-        return sorted_courts[:limit]
+        # Sort courts and keep only the top results
+        return CourtRecommendationEngine._sort_courts(scored_courts, sort_by, limit)
     
     @staticmethod
     def get_all_courts_with_basic_sorting(filters=None, sort_by='name', limit=50):
@@ -141,11 +164,17 @@ class CourtRecommendationEngine:
         return query
     
     @staticmethod
-    def _calculate_court_score(player, court, player_coords, filters=None):
+    def _calculate_court_score(player, court, distance_km, filters=None, avg_price=None,
+                               preferred_location=None):
         """
         Calculate comprehensive recommendation score for a court
         Similar to MatchingEngine's compatibility scoring but for courts
+        
+        preferred_location is the player's lowercased location, precomputed by callers scoring many courts
         """
+        if preferred_location is None:
+            preferred_location = (player.preferred_location or '').lower()
+        
         scores = {
             'preference_score': 0,
             'distance_score': 0,
@@ -159,17 +188,15 @@ class CourtRecommendationEngine:
         scores['preference_score'] = CourtRecommendationEngine._calculate_preference_score(player, court)
         
         # 2. Distance Score (25 points max)
-        if player_coords and court.latitude and court.longitude:
-            court_coords = (court.latitude, court.longitude)
-            distance_km = GeoService.calculate_distance_km(player_coords, court_coords)
+        if distance_km is not None:
             scores['distance_km'] = distance_km
             scores['distance_score'] = CourtRecommendationEngine._calculate_distance_score(
                 distance_km, player.max_travel_distance or 25
             )
         else:
             # If no coordinates, use location string matching
-            if player.preferred_location and court.location:
-                if player.preferred_location.lower() in court.location.lower():
+            if preferred_location and court.location:
+                if preferred_location in court.location.lower():
                     scores['distance_score'] = 20
                 else:
                     scores['distance_score'] = 10
@@ -180,7 +207,7 @@ class CourtRecommendationEngine:
         )
         
         # 4. Value Score (15 points max)
-        scores['value_score'] = CourtRecommendationEngine._calculate_value_score(court)
+        scores['value_score'] = CourtRecommendationEngine._calculate_value_score(court, avg_price)
         
         # 5. Amenity Score (10 points max)
         scores['amenity_score'] = CourtRecommendationEngine._calculate_amenity_score(court, player)
@@ -205,9 +232,11 @@ class CourtRecommendationEngine:
         
         # Preferred court surface (20 points)
         if player.preferred_court_type:
-            if player.preferred_court_type.lower() == court.surface.lower():
+            preferred_surface = player.preferred_court_type.lower()
+            court_surface = court.surface.lower()
+            if preferred_surface == court_surface:
                 score += 20
-            elif player.preferred_court_type.lower() in court.surface.lower():
+            elif preferred_surface in court_surface:
                 score += 10
         else:
             score += 10  # Default bonus if no preference
@@ -229,12 +258,10 @@ class CourtRecommendationEngine:
         if distance_km is None:
             return 10  # Default score if no coordinates
         
-        if distance_km <= 5:
-            return 25  # Very close
-        elif distance_km <= 10:
-            return 20  # Close
-        elif distance_km <= 20:
-            return 15  # Reasonable distance
+        # Very close (25), close (20), reasonable distance (15)
+        tier = bisect_left(_DISTANCE_BINS, distance_km)
+        if tier < len(_DISTANCE_POINTS):
+            return _DISTANCE_POINTS[tier]
         elif distance_km <= max_travel_distance:
             # Linear decrease within max distance
             ratio = 1 - ((distance_km - 20) / (max_travel_distance - 20))
@@ -269,24 +296,27 @@ class CourtRecommendationEngine:
         return score
     
     @staticmethod
-    def _calculate_value_score(court):
-        """Calculate value score based on price comparison"""
-        # Get average price for comparison
+    def _get_average_price():
+        """Get average hourly rate of active courts"""
         try:
-            avg_price = db.session.query(func.avg(Court.hourly_rate)).filter(
+            return db.session.query(func.avg(Court.hourly_rate)).filter(
                 Court.is_active == True
             ).scalar() or 100
-            
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _calculate_value_score(court, avg_price=None):
+        """Calculate value score based on price comparison"""
+        # Get average price for comparison
+        if avg_price is None:
+            avg_price = CourtRecommendationEngine._get_average_price()
+        
+        try:
             price_ratio = court.hourly_rate / avg_price
             
-            if price_ratio <= 0.8:
-                return 15  # Great value
-            elif price_ratio <= 1.0:
-                return 10  # Good value
-            elif price_ratio <= 1.2:
-                return 5   # Fair value
-            else:
-                return 0   # Expensive
+            # Great value (15), good value (10), fair value (5), expensive (0)
+            return _PRICE_RATIO_POINTS[bisect_left(_PRICE_RATIO_BINS, price_ratio)]
                 
         except Exception:
             return 8  # Default if calculation fails
@@ -314,25 +344,29 @@ class CourtRecommendationEngine:
         return min(10, score)
     
     @staticmethod
-    def _sort_courts(scored_courts, sort_by):
-        """Sort courts based on specified criteria"""
-        if sort_by == 'recommended':
-            return sorted(scored_courts, key=lambda x: x['total_score'], reverse=True)
-        elif sort_by == 'price_low':
-            return sorted(scored_courts, key=lambda x: x['court'].hourly_rate)
+    def _sort_courts(scored_courts, sort_by, limit=None):
+        """Sort courts based on specified criteria, selecting only the top `limit` with a heap"""
+        if sort_by == 'price_low':
+            key, reverse = (lambda x: x['court'].hourly_rate), False
         elif sort_by == 'price_high':
-            return sorted(scored_courts, key=lambda x: x['court'].hourly_rate, reverse=True)
+            key, reverse = (lambda x: x['court'].hourly_rate), True
         elif sort_by == 'distance':
             # Sort by distance, putting None values at the end
-            return sorted(scored_courts, 
-                         key=lambda x: x['distance_km'] if x['distance_km'] is not None else float('inf'))
+            key, reverse = (lambda x: x['distance_km'] if x['distance_km'] is not None else float('inf')), False
         elif sort_by == 'name':
-            return sorted(scored_courts, key=lambda x: x['court'].name)
+            key, reverse = (lambda x: x['court'].name), False
         elif sort_by == 'location':
-            return sorted(scored_courts, key=lambda x: x['court'].location)
+            key, reverse = (lambda x: x['court'].location), False
         else:
             # Default to recommended
-            return sorted(scored_courts, key=lambda x: x['total_score'], reverse=True)
+            key, reverse = (lambda x: x['total_score']), True
+        
+        if limit is None:
+            return sorted(scored_courts, key=key, reverse=reverse)
+        
+        # nlargest/nsmallest match sorted(...)[:limit], ties included
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(limit, scored_courts, key=key)
     
     @staticmethod
     def get_sort_options():
@@ -12,6 +12,7 @@ from models.player import Player
 from models.court import Court, Booking
 from models.shared_booking import SharedBooking
 from services.report_service import ReportService
+from services.revenue_service import RevenueService
 from services.court_recommendation_engine import CourtRecommendationEngine
 from utils.db_helpers import db_retry, safe_db_operation
 import json
@@ -248,7 +249,7 @@ class DashboardService:
         """Get dashboard statistics for court owners"""
         try:
             # Get owner's courts
-            owner_courts = Court.query.filter_by(owner_id=owner_id, is_active=True).all()
+            owner_courts = [court for court in RevenueService.get_owner_courts(owner_id) if court.is_active]
             court_ids = [court.id for court in owner_courts]
             
             if not court_ids:
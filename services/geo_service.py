@@ -162,6 +162,31 @@ class GeoService:
         
         return round(distance, 2)
     
+    @staticmethod
+    def calculate_distances_km(origin, destinations):
+        """Haversine distances from one origin to many coordinates (None where coordinates are missing)"""
+        if not origin:
+            return [None] * len(destinations)
+        
+        # Origin terms are computed once for the whole batch
+        lat1, lon1 = radians(origin[0]), radians(origin[1])
+        cos_lat1 = cos(lat1)
+        
+        # Earth radius in kilometers
+        R = 6371
+        
+        distances = []
+        for coords in destinations:
+            if not coords or coords[0] is None or coords[1] is None:
+                distances.append(None)
+                continue
+            
+            lat2, lon2 = radians(coords[0]), radians(coords[1])
+            a = sin((lat2 - lat1)/2)**2 + cos_lat1 * cos(lat2) * sin((lon2 - lon1)/2)**2
+            distances.append(round(R * (2 * asin(sqrt(a))), 2))
+        
+        return distances
+    
     @staticmethod
     def get_distance_score(distance_km):
         """Convert distance to compatibility score (0-100)"""
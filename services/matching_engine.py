@@ -2,32 +2,83 @@
 Perfect Matching Engine for TennisMatchUp
 Real geographic calculations with intelligent compatibility scoring
 """
+from bisect import bisect_left
 from datetime import datetime, timedelta
+from functools import lru_cache
 from models.database import db
 from models.user import User
-from models.player import Player
+from models.player import Player, SKILL_LEVEL_RANKS
 from models.court import Court, Booking
 from services.rule_engine import RuleEngine
 from services.geo_service import GeoService
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case, cast, desc, Numeric
 from sqlalchemy.orm import joinedload
-import random
+from utils.cache import cache, get_or_set, invalidate
+import heapq
+import re
 import time
 
+# Metropolitan areas used by text-based location matching
+_METRO_CITY_AREAS = {
+    'tel aviv': 'tel_aviv', 'tel-aviv': 'tel_aviv', 'ramat gan': 'tel_aviv',
+    'herzliya': 'tel_aviv', 'givatayim': 'tel_aviv', 'holon': 'tel_aviv',
+    'jerusalem': 'jerusalem', 'yerushalayim': 'jerusalem', 'beit shemesh': 'jerusalem',
+    'haifa': 'haifa', 'netanya': 'haifa', 'hadera': 'haifa'
+}
+_METRO_CITY_PATTERN = re.compile(
+    '|'.join(re.escape(city) for city in sorted(_METRO_CITY_AREAS, key=len, reverse=True))
+)
+
+# Scoring tables shared by every candidate comparison
+_SKILL_LEVELS = SKILL_LEVEL_RANKS
+_SKILL_DIFF_POINTS = (35, 28, 15, 5)  # Indexed by skill level difference
+_GEO_DISTANCE_BINS = (2, 5, 10, 15, 25, 35, 50)  # Upper bounds in km
+_GEO_DISTANCE_POINTS = (25, 23, 20, 16, 12, 8, 4, 0)
+_AVAILABILITY_COMPATIBILITY = {
+    ('weekdays', 'evenings'): 15, ('evenings', 'weekdays'): 15,
+    ('weekends', 'evenings'): 12, ('evenings', 'weekends'): 12,
+    ('weekdays', 'weekends'): 8, ('weekends', 'weekdays'): 8
+}
+_COMPETITIVE_WORDS = ('competitive', 'tournament', 'serious', 'advanced', 'professional')
+_SOCIAL_WORDS = ('fun', 'social', 'friendly', 'casual', 'enjoy', 'love')
+_LEARNING_WORDS = ('learning', 'improving', 'practice', 'beginner', 'new')
+
+
+@lru_cache(maxsize=1024)
+def _personality_profile(bio_lower):
+    """Count personality indicators in a lowercased bio as (competitive, social, learning)"""
+    return (
+        sum(1 for word in _COMPETITIVE_WORDS if word in bio_lower),
+        sum(1 for word in _SOCIAL_WORDS if word in bio_lower),
+        sum(1 for word in _LEARNING_WORDS if word in bio_lower)
+    )
+
 class MatchingEngine:
     """Intelligent matching system with real geographic precision"""
     
+    # How long per-player activity summaries stay cached
+    ACTIVITY_CACHE_SECONDS = 600
+    # Court stats are invalidated on every booking write, so the TTL only bounds drift of the date window
+    COURT_STATS_CACHE_SECONDS = 3600
+    AVAILABILITY_HOURS_PER_DAY = 14
+    # Window the court availability score looks ahead over
+    AVAILABILITY_DAYS_AHEAD = 7
+    
     @staticmethod
-    def find_matches(player_id, skill_level=None, location=None, availability=None, limit=10):
-        """Find compatible players with geographic precision"""
+    def find_matches(player_id, skill_level=None, location=None, availability=None, limit=10,
+                     min_compatibility=25):
+        """Find compatible players with geographic precision
+        
+        Candidates scoring below min_compatibility are dropped before match details are built
+        """
         current_player = Player.query.get(player_id)
         if not current_player:
             return []
         
-        # Ensure current player has coordinates
+        # Ensure current player has coordinates (persisted with candidates below)
+        coordinates_updated = False
         if not current_player.latitude or not current_player.longitude:
-            current_player.update_coordinates()
-            db.session.commit()
+            coordinates_updated = current_player.update_coordinates()
         
         # Build base query
         query = Player.query.options(joinedload(Player.user)).join(User).filter(
@@ -37,15 +88,9 @@ class MatchingEngine:
         
         # Apply filters
         if skill_level:
-            skill_levels = {'beginner': 1, 'intermediate': 2, 'advanced': 3, 'professional': 4}
-            target_level = skill_levels.get(skill_level, 2)
-            compatible_levels = []
-            
-            for level_name, level_num in skill_levels.items():
-                if abs(level_num - target_level) <= 1:  # Allow ±1 level difference
-                    compatible_levels.append(level_name)
-            
-            query = query.filter(Player.skill_level.in_(compatible_levels))
+            target_level = _SKILL_LEVELS.get(skill_level, 2)
+            # Allow ±1 level difference, compared on the stored rank
+            query = query.filter(Player.skill_rank.between(target_level - 1, target_level + 1))
         
         if availability:
             # More flexible availability matching
@@ -63,21 +108,26 @@ class MatchingEngine:
         # Get potential matches
         potential_matches = query.limit(100).all()  # Get more for better scoring
         
+        # Validate basic compatibility for all candidates at once
+        validations = RuleEngine.validate_player_matching_bulk(current_player, potential_matches)
+        valid_matches = [p for p in potential_matches if validations[p.id]['valid']]
+        
+        # Geocode only candidates that passed validation (may call the external geocoder), then commit once
+        for match_player in valid_matches:
+            if not match_player.latitude or not match_player.longitude:
+                coordinates_updated = match_player.update_coordinates() or coordinates_updated
+        
+        if coordinates_updated:
+            db.session.commit()
+        
+        # Warm activity summaries for all remaining candidates with a single query
+        MatchingEngine._get_activity_stats([current_player.id] + [p.id for p in valid_matches])
+        
         # Score and rank matches
         scored_matches = []
         current_coords = current_player.get_coordinates()
         
-        for match_player in potential_matches:
-            # Validate basic compatibility
-            validation_result = RuleEngine.validate_player_matching(current_player.id, match_player.id)
-            if not validation_result['valid']:
-                continue
-            
-            # Ensure match player has coordinates
-            if not match_player.latitude or not match_player.longitude:
-                match_player.update_coordinates()
-                db.session.commit()
-            
+        for match_player in valid_matches:
             # Calculate real distance
             match_coords = match_player.get_coordinates()
             real_distance = None
@@ -94,7 +144,7 @@ class MatchingEngine:
             )
             
             # Skip low compatibility scores
-            if compatibility_score < 25:
+            if compatibility_score < min_compatibility:
                 continue
             
             scored_matches.append({
@@ -108,10 +158,8 @@ class MatchingEngine:
                 'geographic_zone': MatchingEngine._get_geographic_zone(real_distance)
             })
         
-        # Sort by compatibility score
-        scored_matches.sort(key=lambda x: x['compatibility_score'], reverse=True)
-        
-        return scored_matches[:limit]
+        # Keep the top matches by compatibility score
+        return heapq.nlargest(limit, scored_matches, key=lambda x: x['compatibility_score'])
     
     @staticmethod
     def _calculate_perfect_compatibility(player1, player2, real_distance=None):
@@ -167,40 +215,16 @@ class MatchingEngine:
     @staticmethod
     def _calculate_skill_compatibility(skill1, skill2):
         """Calculate skill level compatibility (0-35 points)"""
-        skill_map = {'beginner': 1, 'intermediate': 2, 'advanced': 3, 'professional': 4}
-        
-        level1 = skill_map.get(skill1, 2)
-        level2 = skill_map.get(skill2, 2)
-        skill_diff = abs(level1 - level2)
-        
-        if skill_diff == 0:
-            return 35  # Perfect skill match
-        elif skill_diff == 1:
-            return 28  # Close skill match
-        elif skill_diff == 2:
-            return 15  # Manageable difference
-        else:
-            return 5   # Too big difference
+        # 35 perfect, 28 close, 15 manageable, 5 too big a difference
+        skill_diff = abs(_SKILL_LEVELS.get(skill1, 2) - _SKILL_LEVELS.get(skill2, 2))
+        return _SKILL_DIFF_POINTS[skill_diff]
     
     @staticmethod
     def _calculate_geographic_compatibility(distance_km):
         """Calculate geographic compatibility based on real distance (0-25 points)"""
-        if distance_km <= 2:
-            return 25       # Same neighborhood
-        elif distance_km <= 5:
-            return 23       # Same city center
-        elif distance_km <= 10:
-            return 20       # Across city
-        elif distance_km <= 15:
-            return 16       # Neighboring areas
-        elif distance_km <= 25:
-            return 12       # Same metropolitan area
-        elif distance_km <= 35:
-            return 8        # Different cities but doable
-        elif distance_km <= 50:
-            return 4        # Far but possible
-        else:
-            return 0        # Too far
+        # Same neighborhood, city center, across city, neighboring areas,
+        # metropolitan area, different cities, far but possible, too far
+        return _GEO_DISTANCE_POINTS[bisect_left(_GEO_DISTANCE_BINS, distance_km)]
     
     @staticmethod
     def _calculate_location_text_compatibility(loc1, loc2):
@@ -216,26 +240,20 @@ class MatchingEngine:
             return 25
         
         # Metropolitan area matching
-        tel_aviv_metro = ['tel aviv', 'tel-aviv', 'ramat gan', 'herzliya', 'givatayim', 'holon']
-        jerusalem_metro = ['jerusalem', 'yerushalayim', 'beit shemesh']
-        haifa_metro = ['haifa', 'netanya', 'hadera']
-        
-        def get_metro_area(location):
-            for metro_list, name in [(tel_aviv_metro, 'tel_aviv'), 
-                                   (jerusalem_metro, 'jerusalem'), 
-                                   (haifa_metro, 'haifa')]:
-                if any(city in location for city in metro_list):
-                    return name
-            return location
-        
-        metro1 = get_metro_area(loc1_clean)
-        metro2 = get_metro_area(loc2_clean)
+        metro1 = MatchingEngine._get_metro_area(loc1_clean)
+        metro2 = MatchingEngine._get_metro_area(loc2_clean)
         
         if metro1 == metro2:
             return 20  # Same metropolitan area
         else:
             return 8   # Different areas
     
+    @staticmethod
+    def _get_metro_area(location):
+        """Map a cleaned location to its metropolitan area in a single scan"""
+        match = _METRO_CITY_PATTERN.search(location)
+        return _METRO_CITY_AREAS[match.group(0)] if match else location
+    
     @staticmethod
     def _calculate_availability_compatibility(avail1, avail2):
         """Calculate availability compatibility (0-20 points)"""
@@ -253,35 +271,17 @@ class MatchingEngine:
         if 'flexible' in [avail1_clean, avail2_clean]:
             return 18
         
-        # Compatibility matrix
-        compatibility_scores = {
-            ('weekdays', 'evenings'): 15,
-            ('weekends', 'evenings'): 12,
-            ('weekdays', 'weekends'): 8
-        }
-        
-        # Check both directions
-        score = compatibility_scores.get((avail1_clean, avail2_clean)) or \
-                compatibility_scores.get((avail2_clean, avail1_clean)) or 6
-        
-        return score
+        # Compatibility matrix (stored in both directions)
+        return _AVAILABILITY_COMPATIBILITY.get((avail1_clean, avail2_clean), 6)
     
     @staticmethod
     def _calculate_activity_compatibility(player1, player2):
         """Calculate activity level compatibility (0-10 points)"""
         try:
             # Get recent activity for both players
-            recent_cutoff = datetime.now() - timedelta(days=30)
-            
-            p1_bookings = Booking.query.filter(
-                Booking.player_id == player1.id,
-                Booking.created_at >= recent_cutoff
-            ).count()
-            
-            p2_bookings = Booking.query.filter(
-                Booking.player_id == player2.id,
-                Booking.created_at >= recent_cutoff
-            ).count()
+            activity = MatchingEngine._get_activity_stats([player1.id, player2.id])
+            p1_bookings = activity[player1.id]['recent_bookings']
+            p2_bookings = activity[player2.id]['recent_bookings']
             
             # Both active
             if p1_bookings >= 3 and p2_bookings >= 3:
@@ -307,44 +307,25 @@ class MatchingEngine:
         if not bio1 or not bio2:
             return 6  # Neutral
         
-        bio1_lower = bio1.lower()
-        bio2_lower = bio2.lower()
-        
-        # Personality indicators
-        competitive_words = ['competitive', 'tournament', 'serious', 'advanced', 'professional']
-        social_words = ['fun', 'social', 'friendly', 'casual', 'enjoy', 'love']
-        learning_words = ['learning', 'improving', 'practice', 'beginner', 'new']
-        
-        def get_personality_profile(bio):
-            competitive_count = sum(1 for word in competitive_words if word in bio)
-            social_count = sum(1 for word in social_words if word in bio)
-            learning_count = sum(1 for word in learning_words if word in bio)
-            
-            return {
-                'competitive': competitive_count,
-                'social': social_count,
-                'learning': learning_count
-            }
-        
-        profile1 = get_personality_profile(bio1_lower)
-        profile2 = get_personality_profile(bio2_lower)
+        # Personality profiles are memoized per bio text
+        competitive1, social1, learning1 = _personality_profile(bio1.lower())
+        competitive2, social2, learning2 = _personality_profile(bio2.lower())
         
         # Calculate compatibility
         total_compatibility = 0
         
         # Similar competitive level
-        comp_diff = abs(profile1['competitive'] - profile2['competitive'])
-        if comp_diff <= 1:
+        if abs(competitive1 - competitive2) <= 1:
             total_compatibility += 4
         
         # Both social or both serious
-        if profile1['social'] > 0 and profile2['social'] > 0:
+        if social1 > 0 and social2 > 0:
             total_compatibility += 3
-        elif profile1['competitive'] > 0 and profile2['competitive'] > 0:
+        elif competitive1 > 0 and competitive2 > 0:
             total_compatibility += 3
         
         # Learning compatibility
-        if profile1['learning'] > 0 and profile2['learning'] > 0:
+        if learning1 > 0 and learning2 > 0:
             total_compatibility += 3
         
         return min(10, total_compatibility)
@@ -398,7 +379,7 @@ class MatchingEngine:
     @staticmethod
     def _skill_level_to_num(skill_level):
         """Convert skill level to number"""
-        return {'beginner': 1, 'intermediate': 2, 'advanced': 3, 'professional': 4}.get(skill_level, 2)
+        return _SKILL_LEVELS.get(skill_level, 2)
     
     @staticmethod
     def _is_valid_availability(availability):
@@ -409,15 +390,42 @@ class MatchingEngine:
             return availability.lower() not in ['none', 'null', '', 'undefined']
         return True
     
+    @staticmethod
+    def _get_activity_stats(player_ids):
+        """Get 30-day booking counts and last booking time per player from a cached summary"""
+        stats = {}
+        missing_ids = []
+        for player_id in set(player_ids):
+            cached = cache.get(f'matching:activity:{player_id}')
+            if cached is None:
+                missing_ids.append(player_id)
+            else:
+                stats[player_id] = cached
+        
+        if missing_ids:
+            # One grouped query refreshes the summary for every uncached player
+            recent_cutoff = datetime.now() - timedelta(days=30)
+            rows = db.session.query(
+                Booking.player_id,
+                func.sum(case((Booking.created_at >= recent_cutoff, 1), else_=0)),
+                func.max(Booking.created_at)
+            ).filter(
+                Booking.player_id.in_(missing_ids)
+            ).group_by(Booking.player_id).all()
+            
+            found = {player_id: (recent, last) for player_id, recent, last in rows}
+            for player_id in missing_ids:
+                recent, last = found.get(player_id, (0, None))
+                stats[player_id] = {'recent_bookings': int(recent or 0), 'last_booking_at': last}
+                cache.set(f'matching:activity:{player_id}', stats[player_id],
+                          timeout=MatchingEngine.ACTIVITY_CACHE_SECONDS)
+        
+        return stats
+    
     @staticmethod
     def _get_activity_summary(player_id):
         """Get comprehensive activity summary"""
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        
-        recent_bookings = Booking.query.filter(
-            Booking.player_id == player_id,
-            Booking.created_at >= thirty_days_ago
-        ).count()
+        recent_bookings = MatchingEngine._get_activity_stats([player_id])[player_id]['recent_bookings']
         
         # Determine activity level
         if recent_bookings >= 8:
@@ -441,12 +449,10 @@ class MatchingEngine:
     def _get_days_since_last_booking(player_id):
         """Get days since last booking"""
         try:
-            last_booking = Booking.query.filter_by(player_id=player_id).order_by(
-                Booking.created_at.desc()
-            ).first()
+            last_booking_at = MatchingEngine._get_activity_stats([player_id])[player_id]['last_booking_at']
             
-            if last_booking:
-                days_diff = (datetime.now() - last_booking.created_at).days
+            if last_booking_at:
+                days_diff = (datetime.now() - last_booking_at).days
                 return days_diff
             else:
                 return 999  # Never booked
@@ -500,15 +506,18 @@ class MatchingEngine:
         # Use geographic service to find optimal meeting points
         court_suggestions = GeoService.suggest_meeting_points(coords1, coords2, max_courts * 2)
         
-        # Add business logic scoring
+        # Add business logic scoring - each player's scores for all suggested courts in one pass
+        suggested_courts = [suggestion['court'] for suggestion in court_suggestions]
+        court_locations = [court.location.lower() for court in suggested_courts]
+        player1_scores = RuleEngine.calculate_court_recommendation_scores(suggested_courts, player1, court_locations)
+        player2_scores = RuleEngine.calculate_court_recommendation_scores(suggested_courts, player2, court_locations)
+        
         enhanced_suggestions = []
-        for suggestion in court_suggestions:
+        for suggestion, score1, score2 in zip(court_suggestions, player1_scores, player2_scores):
             court = suggestion['court']
             
             # Apply business rules
-            business_score = RuleEngine.calculate_court_recommendation_score(court, player1)
-            business_score += RuleEngine.calculate_court_recommendation_score(court, player2)
-            business_score = business_score / 2  # Average
+            business_score = (score1 + score2) / 2  # Average
             
             # Combine geographic and business scores
             total_score = (suggestion['total_score'] * 0.6) + (business_score * 0.4)
@@ -521,31 +530,31 @@ class MatchingEngine:
                 'recommendation_reason': MatchingEngine._generate_court_recommendation_reason(suggestion)
             })
         
-        # Sort by total score
-        enhanced_suggestions.sort(key=lambda x: x['total_score'], reverse=True)
-        
-        return enhanced_suggestions[:max_courts]
+        # Keep the best-scoring courts
+        return heapq.nlargest(max_courts, enhanced_suggestions, key=lambda x: x['total_score'])
     
     @staticmethod
     def _recommend_courts_by_location_text(player1, player2, max_courts=5):
         """Fallback court recommendation without coordinates"""
         # Simple text-based court recommendation
-        location_priority = [player1.preferred_location, player2.preferred_location]
+        location_priority = [player1.preferred_location.lower(), player2.preferred_location.lower()]
         
         courts = Court.query.filter(Court.is_active == True).all()
+        # Lowercased once per court and shared with the business scoring
+        court_locations = [court.location.lower() for court in courts]
+        business_scores = RuleEngine.calculate_court_recommendation_scores(courts, player1, court_locations)
         court_scores = []
         
-        for court in courts:
+        for court, court_location, business_score in zip(courts, court_locations, business_scores):
             score = 50  # Base score
             
             # Location matching
             for player_location in location_priority:
-                if player_location.lower() in court.location.lower():
+                if player_location in court_location:
                     score += 25
                     break
             
             # Business factors
-            business_score = RuleEngine.calculate_court_recommendation_score(court, player1)
             score += business_score * 0.3
             
             court_scores.append({
@@ -554,8 +563,7 @@ class MatchingEngine:
                 'recommendation_reason': f"Good option in {court.location}"
             })
         
-        court_scores.sort(key=lambda x: x['score'], reverse=True)
-        return court_scores[:max_courts]
+        return heapq.nlargest(max_courts, court_scores, key=lambda x: x['score'])
     
     @staticmethod
     def _generate_court_recommendation_reason(suggestion):
@@ -690,22 +698,52 @@ class MatchingEngine:
     @staticmethod
     def _calculate_distance(location1, location2):
         """Legacy distance calculation - now uses real coordinates when available"""
-        # Try to get players by location name and calculate real distance
-        players1 = Player.query.filter(Player.preferred_location.ilike(f'%{location1}%')).first()
-        players2 = Player.query.filter(Player.preferred_location.ilike(f'%{location2}%')).first()
-        
-        if players1 and players2:
-            coords1 = players1.get_coordinates()
-            coords2 = players2.get_coordinates()
-            
-            if coords1 and coords2:
-                return GeoService.calculate_distance_km(coords1, coords2)
-        
-        # Fallback to old text-based estimation
+        # Resolve both locations against cached per-location centroids
+        centroids = MatchingEngine._get_location_centroids()
+        coords1 = MatchingEngine._lookup_location_centroid(centroids, location1)
+        coords2 = MatchingEngine._lookup_location_centroid(centroids, location2)
+
+        if coords1 and coords2:
+            return GeoService.calculate_distance_km(coords1, coords2)
+
+        # Fallback to text-based estimation (deterministic midpoints of the old ranges)
         if location1.lower() == location2.lower():
-            return random.uniform(0, 5)
+            return 2.5
         else:
-            return random.uniform(10, 50)
+            return 30.0
+
+    @staticmethod
+    def _get_location_centroids():
+        """Get average player coordinates per preferred location (cached)"""
+        def load_centroids():
+            rows = db.session.query(
+                func.lower(Player.preferred_location),
+                func.avg(Player.latitude),
+                func.avg(Player.longitude)
+            ).filter(
+                Player.preferred_location.isnot(None),
+                Player.latitude.isnot(None),
+                Player.longitude.isnot(None)
+            ).group_by(func.lower(Player.preferred_location)).all()
+
+            return {location: (lat, lng) for location, lat, lng in rows}
+
+        return get_or_set('matching:location_centroids', load_centroids, timeout=3600)
+
+    @staticmethod
+    def _lookup_location_centroid(centroids, location):
+        """Find centroid for a location name, falling back to partial name match"""
+        if not location:
+            return None
+
+        location_key = location.lower().strip()
+        if location_key in centroids:
+            return centroids[location_key]
+
+        for known_location, coords in centroids.items():
+            if location_key in known_location:
+                return coords
+        return None
     
     @staticmethod
     def _get_recent_activity(player_id):
@@ -758,100 +796,177 @@ class MatchingEngine:
             if len(filtered_results) >= limit:
                 break
         
+        # Load legacy metrics for all courts with one grouped query each
+        court_ids = [result['court'].id for result in filtered_results]
+        owner_ids = {result['court'].owner_id for result in filtered_results}
+        availability_by_court = MatchingEngine._calculate_courts_availability(court_ids)
+        rating_by_owner = MatchingEngine._get_court_owner_ratings(owner_ids)
+        recent_by_court = MatchingEngine._get_courts_recent_bookings(court_ids)
+        
         # Convert to legacy format for backward compatibility
         legacy_results = []
         for result in filtered_results:
             court = result['court']
             
-            # Get additional information in legacy format
-            availability_score = MatchingEngine._calculate_court_availability(court.id)
-            owner_rating = MatchingEngine._get_court_owner_rating(court.owner_id)
-            
             legacy_results.append({
                 'court': court,
                 'owner': court.owner,
                 'recommendation_score': result['total_score'],
-                'availability_score': availability_score,
-                'owner_rating': owner_rating,
+                'availability_score': availability_by_court[court.id],
+                'owner_rating': rating_by_owner[court.owner_id],
                 'distance': result['distance_km'],
-                'recent_bookings': MatchingEngine._get_court_recent_bookings(court.id)
+                'recent_bookings': recent_by_court[court.id]
             })
         
         return legacy_results
+    
     @staticmethod
-    def _calculate_court_availability(court_id, days_ahead=7):
+    def _calculate_court_availability(court_id, days_ahead=AVAILABILITY_DAYS_AHEAD):
         """Calculate court availability score"""
-        # Check how many slots are available in the next week
-        start_date = datetime.now().date()
-        end_date = start_date + timedelta(days=days_ahead)
-        
-        # Get existing bookings
-        existing_bookings = Booking.query.filter(
-            Booking.court_id == court_id,
-            Booking.booking_date.between(start_date, end_date),
-            Booking.status.in_(['confirmed', 'pending'])
-        ).count()
-        
-        # Calculate total possible slots (simplified: 14 hours per day * days)
-        total_possible_slots = 14 * days_ahead
-        availability_percentage = ((total_possible_slots - existing_bookings) / total_possible_slots) * 100
+        return MatchingEngine._calculate_courts_availability([court_id], days_ahead)[court_id]
+    
+    @staticmethod
+    def _calculate_courts_availability(court_ids, days_ahead=AVAILABILITY_DAYS_AHEAD):
+        """Calculate availability scores for several courts, serving recent results from cache"""
+        availability = {}
+        missing_ids = []
+        for court_id in set(court_ids):
+            cached = cache.get(MatchingEngine._court_availability_key(court_id, days_ahead))
+            if cached is None:
+                missing_ids.append(court_id)
+            else:
+                availability[court_id] = cached
         
-        return round(max(0, availability_percentage), 1)
+        if missing_ids:
+            # Check how many slots are available in the next week
+            start_date = datetime.now().date()
+            end_date = start_date + timedelta(days=days_ahead)
+            
+            # Count existing bookings per court
+            booking_counts = dict(db.session.query(
+                Booking.court_id, func.count(Booking.id)
+            ).filter(
+                Booking.court_id.in_(missing_ids),
+                Booking.booking_date.between(start_date, end_date),
+                Booking.status.in_(['confirmed', 'pending'])
+            ).group_by(Booking.court_id).all())
+            
+            # Calculate total possible slots (simplified: one slot per business hour per day)
+            total_possible_slots = MatchingEngine.AVAILABILITY_HOURS_PER_DAY * days_ahead
+            
+            for court_id in missing_ids:
+                existing_bookings = booking_counts.get(court_id, 0)
+                availability_percentage = ((total_possible_slots - existing_bookings) / total_possible_slots) * 100
+                availability[court_id] = round(max(0, availability_percentage), 1)
+                cache.set(MatchingEngine._court_availability_key(court_id, days_ahead), availability[court_id],
+                          timeout=MatchingEngine.COURT_STATS_CACHE_SECONDS)
+        
+        return availability
+    
+    @staticmethod
+    def _court_availability_key(court_id, days_ahead=AVAILABILITY_DAYS_AHEAD):
+        """Cache key for a court's availability score"""
+        return f'matching:court_availability:{court_id}:{days_ahead}'
+    
+    @staticmethod
+    def _owner_rating_key(owner_id):
+        """Cache key for an owner's rating"""
+        return f'matching:owner_rating:{owner_id}'
     
     @staticmethod
     def _get_court_owner_rating(owner_id):
         """Get owner rating based on booking history"""
-        # Calculate based on booking confirmations, cancellations, etc.
-        total_bookings = Booking.query.join(Court).filter(Court.owner_id == owner_id).count()
-        
-        if total_bookings == 0:
-            return 5.0  # New owners get benefit of the doubt
-        
-        confirmed_bookings = Booking.query.join(Court).filter(
-            Court.owner_id == owner_id,
-            Booking.status == 'confirmed'
-        ).count()
+        return MatchingEngine._get_court_owner_ratings([owner_id])[owner_id]
+    
+    @staticmethod
+    def _get_court_owner_ratings(owner_ids):
+        """Get owner ratings for several owners, serving recent results from cache"""
+        ratings = {}
+        missing_ids = []
+        for owner_id in set(owner_ids):
+            cached = cache.get(MatchingEngine._owner_rating_key(owner_id))
+            if cached is None:
+                missing_ids.append(owner_id)
+            else:
+                ratings[owner_id] = cached
         
-        cancelled_by_owner = Booking.query.join(Court).filter(
-            Court.owner_id == owner_id,
-            Booking.status == 'cancelled',
-            Booking.cancellation_reason.like('%owner%')
-        ).count()
+        if not missing_ids:
+            return ratings
         
-        # Calculate rating (simplified formula)
-        confirmation_rate = confirmed_bookings / total_bookings if total_bookings > 0 else 1
-        cancellation_penalty = (cancelled_by_owner / total_bookings) * 2 if total_bookings > 0 else 0
+        # Calculate based on booking confirmations, cancellations, etc.
+        rows = db.session.query(
+            Court.owner_id,
+            func.count(Booking.id),
+            func.sum(case((Booking.status == 'confirmed', 1), else_=0)),
+            func.sum(case((and_(
+                Booking.status == 'cancelled',
+                Booking.cancellation_reason.like('%owner%')
+            ), 1), else_=0))
+        ).join(Booking, Booking.court_id == Court.id).filter(
+            Court.owner_id.in_(missing_ids)
+        ).group_by(Court.owner_id).all()
+        
+        counts = {owner_id: (total, confirmed, cancelled) for owner_id, total, confirmed, cancelled in rows}
+        
+        for owner_id in missing_ids:
+            total_bookings, confirmed_bookings, cancelled_by_owner = counts.get(owner_id, (0, 0, 0))
+            
+            if total_bookings == 0:
+                rating = 5.0  # New owners get benefit of the doubt
+            else:
+                # Calculate rating (simplified formula)
+                confirmation_rate = (confirmed_bookings or 0) / total_bookings
+                cancellation_penalty = ((cancelled_by_owner or 0) / total_bookings) * 2
+                rating = round(max(1.0, min(5.0, (confirmation_rate * 5) - cancellation_penalty)), 1)
+            
+            ratings[owner_id] = rating
+            cache.set(MatchingEngine._owner_rating_key(owner_id), rating,
+                      timeout=MatchingEngine.COURT_STATS_CACHE_SECONDS)
         
-        rating = (confirmation_rate * 5) - cancellation_penalty
-        return round(max(1.0, min(5.0, rating)), 1)
+        return ratings
+    
+    @staticmethod
+    def invalidate_court_stats(court_id, owner_id):
+        """Drop cached availability and owner rating after a booking changes; the next read recomputes them"""
+        invalidate(MatchingEngine._court_availability_key(court_id),
+                   MatchingEngine._owner_rating_key(owner_id))
+    
+    @staticmethod
+    def invalidate_activity_stats(player_id):
+        """Drop a player's cached activity summary after they make a booking"""
+        invalidate(f'matching:activity:{player_id}')
     
     @staticmethod
     def _get_court_recent_bookings(court_id, days=30):
         """Get recent booking count for a court"""
+        return MatchingEngine._get_courts_recent_bookings([court_id], days)[court_id]
+    
+    @staticmethod
+    def _get_courts_recent_bookings(court_ids, days=30):
+        """Get recent booking counts for several courts in one query"""
         cutoff_date = datetime.now() - timedelta(days=days)
-        return Booking.query.filter(
-            Booking.court_id == court_id,
+        counts = dict(db.session.query(
+            Booking.court_id, func.count(Booking.id)
+        ).filter(
+            Booking.court_id.in_(court_ids),
             Booking.created_at >= cutoff_date
-        ).count()
+        ).group_by(Booking.court_id).all()) if court_ids else {}
+        
+        return {court_id: counts.get(court_id, 0) for court_id in court_ids}
     
     @staticmethod
     def suggest_playing_partners(player_id, limit=5):
         """Suggest specific playing partners based on compatibility and activity"""
-        matches = MatchingEngine.find_matches(player_id, limit=limit * 2)  # Get more for filtering
-        
-        # Filter for most active and compatible players
-        suggestions = []
-        for match in matches:
-            if match['compatibility_score'] >= 70:  # High compatibility threshold
-                suggestions.append({
-                    'player': match['player'],
-                    'user': match['user'],
-                    'compatibility_score': match['compatibility_score'],
-                    'reason': MatchingEngine._generate_match_reason(match),
-                    'suggested_action': MatchingEngine._suggest_next_action(match)
-                })
+        # Only highly compatible players (threshold applied inside find_matches)
+        matches = MatchingEngine.find_matches(player_id, limit=limit, min_compatibility=70)
         
-        return suggestions[:limit]
+        return [{
+            'player': match['player'],
+            'user': match['user'],
+            'compatibility_score': match['compatibility_score'],
+            'reason': MatchingEngine._generate_match_reason(match),
+            'suggested_action': MatchingEngine._suggest_next_action(match)
+        } for match in matches]
     
     @staticmethod
     def _generate_match_reason(match_data):
@@ -906,22 +1021,22 @@ class MatchingEngine:
         start_hour = 6
         end_hour = 22
         
+        # Mark every business hour touched by a booking in one bitmask (bit 0 = 6 AM)
+        busy = 0
+        for booking in existing_bookings:
+            first_hour = max(booking.start_time.hour, start_hour)
+            last_hour = booking.end_time.hour + (1 if booking.end_time.minute or booking.end_time.second else 0)
+            for hour in range(first_hour, min(last_hour, end_hour)):
+                busy |= 1 << (hour - start_hour)
+        
+        slot_mask = (1 << duration_hours) - 1
         current_hour = start_hour
         while current_hour + duration_hours <= end_hour:
-            slot_start = datetime.strptime(f'{current_hour:02d}:00', '%H:%M').time()
-            slot_end = datetime.strptime(f'{current_hour + duration_hours:02d}:00', '%H:%M').time()
-            
-            # Check if this slot conflicts with any existing booking
-            conflicts = False
-            for booking in existing_bookings:
-                if (slot_start < booking.end_time and slot_end > booking.start_time):
-                    conflicts = True
-                    break
-            
-            if not conflicts:
+            # Slot is free when none of its hours are marked busy
+            if not busy & (slot_mask << (current_hour - start_hour)):
                 available_slots.append({
-                    'start_time': slot_start.strftime('%H:%M'),
-                    'end_time': slot_end.strftime('%H:%M'),
+                    'start_time': f'{current_hour:02d}:00',
+                    'end_time': f'{current_hour + duration_hours:02d}:00',
                     'duration': duration_hours
                 })
             
@@ -956,40 +1071,55 @@ class MatchingEngine:
         return popular_courts
     
     @staticmethod
-    def get_match_statistics(player_id):
-        """Get matching statistics for a player"""
+    def get_match_statistics(player_id, include_matches=True):
+        """Get matching statistics for a player
+        
+        include_matches=False skips the full find_matches run (match fields are None)
+        """
         player = Player.query.get(player_id)
         if not player:
             return None
         
-        # Calculate various stats
-        total_possible_matches = Player.query.join(User).filter(
+        # Calculate both simple counts in one round trip
+        possible_matches_query = db.session.query(func.count(Player.id)).join(User).filter(
             Player.id != player_id,
             User.is_active == True
-        ).count()
-        
-        compatible_matches = len(MatchingEngine.find_matches(player_id, limit=total_possible_matches))
-        
-        # Recent activity
-        recent_bookings = Booking.query.filter(
+        ).scalar_subquery()
+        recent_bookings_query = db.session.query(func.count(Booking.id)).filter(
             Booking.player_id == player_id,
             Booking.created_at >= datetime.now() - timedelta(days=30)
-        ).count()
+        ).scalar_subquery()
+        total_possible_matches, recent_bookings = db.session.query(
+            possible_matches_query, recent_bookings_query
+        ).one()
         
-        return {
+        stats = {
             'total_possible_matches': total_possible_matches,
-            'compatible_matches': compatible_matches,
-            'compatibility_rate': round((compatible_matches / max(1, total_possible_matches)) * 100, 1),
+            'compatible_matches': None,
+            'compatibility_rate': None,
             'recent_activity': {
                 'bookings_last_30_days': recent_bookings,
                 'activity_level': 'High' if recent_bookings > 4 else 'Medium' if recent_bookings > 1 else 'Low'
             },
-            'recommendations': {
-                'improve_profile': compatible_matches < total_possible_matches * 0.3,
-                'be_more_flexible': compatible_matches < 5,
-                'expand_location': player.preferred_location and compatible_matches < 10
-            }
+            'recommendations': None
         }
+        
+        if not include_matches:
+            return stats
+        
+        compatible_matches = 0
+        if total_possible_matches > 0:
+            compatible_matches = len(MatchingEngine.find_matches(player_id, limit=total_possible_matches))
+        
+        stats['compatible_matches'] = compatible_matches
+        stats['compatibility_rate'] = round((compatible_matches / max(1, total_possible_matches)) * 100, 1)
+        stats['recommendations'] = {
+            'improve_profile': compatible_matches < total_possible_matches * 0.3,
+            'be_more_flexible': compatible_matches < 5,
+            'expand_location': player.preferred_location and compatible_matches < 10
+        }
+        
+        return stats
     
     @staticmethod
     def get_trending_locations():
@@ -997,22 +1127,28 @@ class MatchingEngine:
         # Get locations with most bookings in last 7 days
         week_ago = datetime.now() - timedelta(days=7)
         
+        recent_bookings = func.count(Booking.id)
+        court_count = func.count(func.distinct(Court.id))
+        trend_score = (recent_bookings * 10 + court_count * 5).label('trend_score')
+        
         trending = db.session.query(
             Court.location,
-            func.count(Booking.id).label('recent_bookings'),
-            func.count(func.distinct(Court.id)).label('court_count'),
-            func.avg(Court.hourly_rate).label('avg_rate')
+            recent_bookings.label('recent_bookings'),
+            court_count.label('court_count'),
+            # Cast to NUMERIC so PostgreSQL accepts round(x, 2)
+            func.round(cast(func.avg(Court.hourly_rate), Numeric), 2).label('avg_rate'),
+            trend_score
         ).join(Booking).filter(
             Booking.created_at >= week_ago,
             Court.is_active == True
         ).group_by(Court.location).order_by(
-            func.count(Booking.id).desc()
+            desc('trend_score')
         ).limit(10).all()
         
         return [{
             'location': item.location,
             'recent_bookings': item.recent_bookings,
             'court_count': item.court_count,
-            'avg_rate': round(float(item.avg_rate), 2) if item.avg_rate else 0,
-            'trend_score': item.recent_bookings * 10 + item.court_count * 5
+            'avg_rate': float(item.avg_rate) if item.avg_rate else 0,
+            'trend_score': item.trend_score
         } for item in trending]
\ No newline at end of file
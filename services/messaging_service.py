@@ -6,6 +6,8 @@ from models.database import db
 from models.message import Message
 from models.user import User
 from services.rule_engine import RuleEngine
+from sqlalchemy import func
+from utils.cache import cache, adjust_counter, invalidate
 from datetime import datetime, timedelta
 import logging
 
@@ -14,6 +16,8 @@ logger = logging.getLogger(__name__)
 class MessagingService:
     """Professional messaging service following TennisMatchUp architecture"""
     
+    UNREAD_CACHE_SECONDS = 300
+    
     @staticmethod
     def send_message(sender_id, receiver_id, content, message_type='text', related_booking_id=None):
         """
@@ -49,6 +53,7 @@ class MessagingService:
             # Save to database
             db.session.add(message)
             db.session.commit()
+            adjust_counter(f'messaging:unread:{receiver_id}', 1)
             
             logger.info(f"Message sent: {sender_id} -> {receiver_id}, type: {message_type}")
             
@@ -76,41 +81,37 @@ class MessagingService:
             list: List of conversation dictionaries with participant info and last message
         """
         try:
-            # Use the existing static method but enhance the data
-            raw_conversations = Message.get_user_conversations(user_id)
-            
-            conversations = []
-            for conv in raw_conversations[:limit]:
-                # Get the other participant ID from the conversation data
-                other_user_id = conv['partner_id']
-                other_user = User.query.get(other_user_id)
-                
-                if not other_user:
-                    continue
-                
-                # Use last message from conversation data
-                last_message = conv['last_message']
-                
-                # Count unread messages from this user
-                unread_count = Message.query.filter(
-                    Message.sender_id == other_user_id,
-                    Message.receiver_id == user_id,
-                    Message.is_read == False
-                ).count()
-                
-                # Create simple objects that the template expects
-                class ConversationData:
-                    def __init__(self):
-                        self.other_user = other_user
-                        self.last_message = last_message
-                        self.unread_count = unread_count
-                        self.has_unread = unread_count > 0
-                
-                conversation_data = ConversationData()
-                conversations.append(conversation_data)
+            # Partners come back already joined to active users, newest conversation first
+            raw_conversations = Message.get_user_conversations(user_id, limit=limit)
+            if not raw_conversations:
+                return []
+            other_ids = [conv['partner_id'] for conv in raw_conversations]
             
-            # Sort by last message time
-            conversations.sort(key=lambda x: x.last_message.created_at if x.last_message else datetime.min, reverse=True)
+            # Load all unread counts in one query
+            unread_by_sender = dict(db.session.query(
+                Message.sender_id, func.count(Message.id)
+            ).filter(
+                Message.receiver_id == user_id,
+                Message.sender_id.in_(other_ids),
+                Message.is_read == False
+            ).group_by(Message.sender_id).all())
+            
+            # Create simple objects that the template expects
+            class ConversationData:
+                def __init__(self, other_user, last_message, unread_count):
+                    self.other_user = other_user
+                    self.last_message = last_message
+                    self.unread_count = unread_count
+                    self.has_unread = unread_count > 0
+            
+            conversations = [
+                ConversationData(
+                    conv['partner'],
+                    conv['last_message'],
+                    unread_by_sender.get(conv['partner_id'], 0)
+                )
+                for conv in raw_conversations
+            ]
             
             return conversations
             
@@ -119,18 +120,19 @@ class MessagingService:
             return []
     
     @staticmethod
-    def get_conversation_messages(user_id, other_user_id, page=1, per_page=50):
+    def get_conversation_messages(user_id, other_user_id, page=1, per_page=50, before_id=None):
         """
         Get messages in a conversation between two users with pagination
         
         Args:
             user_id (int): Current user ID
             other_user_id (int): Other participant ID
-            page (int): Page number for pagination
+            page (int): Page number for pagination (ignored when before_id is given)
             per_page (int): Messages per page
+            before_id (int): Keyset cursor - return messages older than this message ID
             
         Returns:
-            dict: {'messages': list, 'has_next': bool, 'has_prev': bool, 'total': int}
+            dict: {'messages': list, 'has_next': bool, 'has_prev': bool, 'total': int, 'next_before_id': int}
         """
         try:
             # Validate users exist and are active
@@ -140,27 +142,51 @@ class MessagingService:
             if not user or not other_user or not user.is_active or not other_user.is_active:
                 return {'messages': [], 'has_next': False, 'has_prev': False, 'total': 0}
             
-            # Get paginated messages using existing static method but with pagination
             query = Message.query.filter(
                 db.or_(
                     db.and_(Message.sender_id == user_id, Message.receiver_id == other_user_id),
                     db.and_(Message.sender_id == other_user_id, Message.receiver_id == user_id)
                 )
-            ).order_by(Message.created_at.desc())
-            
-            paginated = query.paginate(
-                page=page, 
-                per_page=per_page, 
-                error_out=False
             )
             
+            total = None
+            pages = None
+            if before_id is None and page > 1:
+                # Legacy page numbers still use OFFSET paging
+                paginated = query.order_by(Message.id.desc()).paginate(
+                    page=page,
+                    per_page=per_page,
+                    error_out=False
+                )
+                page_items = paginated.items
+                has_next = paginated.has_next
+                has_prev = paginated.has_prev
+                total = paginated.total
+                pages = paginated.pages
+            else:
+                # Keyset paging: fetch one extra row to know whether older messages exist
+                if before_id is None:
+                    # Total is only needed for the first page header
+                    total = query.count()
+                    pages = max(1, -(-total // per_page))
+                else:
+                    query = query.filter(Message.id < before_id)
+                
+                rows = query.order_by(Message.id.desc()).limit(per_page + 1).all()
+                page_items = rows[:per_page]
+                has_next = len(rows) > per_page
+                has_prev = before_id is not None
+            
+            # Every sender is one of the two participants loaded above
+            participants = {user.id: user, other_user.id: other_user}
+            
             messages = []
-            for message in reversed(paginated.items):  # Reverse to show oldest first
+            for message in reversed(page_items):  # Reverse to show oldest first
                 message_data = {
                     'id': message.id,
                     'content': message.content,
                     'sender_id': message.sender_id,
-                    'sender_name': message.sender.full_name,
+                    'sender_name': participants[message.sender_id].full_name,
                     'is_from_me': message.sender_id == user_id,
                     'message_type': message.message_type,
                     'message_type_display': message.get_message_type_display(),
@@ -175,11 +201,12 @@ class MessagingService:
             
             return {
                 'messages': messages,
-                'has_next': paginated.has_next,
-                'has_prev': paginated.has_prev,
-                'total': paginated.total,
-                'pages': paginated.pages,
-                'current_page': page
+                'has_next': has_next,
+                'has_prev': has_prev,
+                'total': total,
+                'pages': pages,
+                'current_page': page,
+                'next_before_id': page_items[-1].id if has_next else None
             }
             
         except Exception as e:
@@ -199,14 +226,9 @@ class MessagingService:
             dict: {'success': bool, 'marked_count': int}
         """
         try:
-            # Use existing static method from Message model
-            marked_count = Message.query.filter(
-                Message.sender_id == other_user_id,
-                Message.receiver_id == user_id,
-                Message.is_read == False
-            ).count()
-            
-            Message.mark_conversation_as_read(user_id, other_user_id)
+            # Use existing static method from Message model (UPDATE returns the affected rowcount)
+            marked_count = Message.mark_conversation_as_read(user_id, other_user_id)
+            adjust_counter(f'messaging:unread:{user_id}', -marked_count)
             
             logger.info(f"Marked {marked_count} messages as read for user {user_id} from {other_user_id}")
             
@@ -228,11 +250,22 @@ class MessagingService:
             int: Number of unread messages
         """
         try:
-            return Message.count_unread_messages(user_id)
+            # Counter is kept in step by send/mark-read and re-seeded from the DB on a miss
+            cache_key = f'messaging:unread:{user_id}'
+            count = cache.get(cache_key)
+            if count is None:
+                count = Message.count_unread_messages(user_id)
+                cache.set(cache_key, count, timeout=MessagingService.UNREAD_CACHE_SECONDS)
+            return max(0, int(count))
         except Exception as e:
             logger.error(f"Error counting unread messages for user {user_id}: {str(e)}")
             return 0
     
+    @staticmethod
+    def invalidate_unread_count(*user_ids):
+        """Drop cached unread counters after messages are created or read outside this service"""
+        invalidate(*[f'messaging:unread:{user_id}' for user_id in user_ids])
+    
     @staticmethod
     def search_messages(user_id, query, limit=50):
         """
@@ -257,11 +290,18 @@ class MessagingService:
                 Message.content.ilike(search_term)
             ).order_by(Message.created_at.desc()).limit(limit).all()
             
+            # Load all other participants in one query
+            other_ids = {
+                message.receiver_id if message.sender_id == user_id else message.sender_id
+                for message in messages
+            }
+            users_by_id = {u.id: u for u in User.query.filter(User.id.in_(other_ids)).all()} if other_ids else {}
+            
             results = []
             for message in messages:
                 # Determine other participant
                 other_user_id = message.receiver_id if message.sender_id == user_id else message.sender_id
-                other_user = User.query.get(other_user_id)
+                other_user = users_by_id.get(other_user_id)
                 
                 result = {
                     'message_id': message.id,
@@ -8,14 +8,30 @@ from models.user import User
 from models.player import Player
 from models.court import Court, Booking
 from models.message import Message
-from sqlalchemy import func, and_, or_, desc
-from collections import defaultdict
+from services.revenue_service import RevenueService
+from sqlalchemy import func, and_, or_, desc, bindparam, Date, DateTime, Integer, literal, select, union_all
+from sqlalchemy.orm import selectinload, Load
+from flask import current_app
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import cache, get_or_set
+from utils.db_helpers import count_where
+from uuid import uuid4
 import json
 
 
 class ReportService:
     """Centralized reporting and analytics service"""
     
+    ROLLUP_CACHE_SECONDS = 900
+    DASHBOARD_CACHE_SECONDS = 60
+    INSIGHTS_CACHE_SECONDS = 300
+    BUSINESS_INSIGHTS_CACHE_SECONDS = 3600
+    EXPORT_CACHE_SECONDS = 300
+    
+    # Prebuilt analytics statements per database dialect (see _report_statements)
+    _STATEMENTS = {}
+    
     @staticmethod
     def get_platform_statistics():
         """Get platform-wide statistics for landing page"""
@@ -45,44 +61,86 @@ class ReportService:
     
     @staticmethod
     def generate_admin_dashboard_stats():
-        """Generate comprehensive admin dashboard statistics"""
+        """Generate comprehensive admin dashboard statistics (reused for up to a minute)"""
+        return ReportService._cached_report(
+            'admin_dashboard_stats',
+            ReportService._build_admin_dashboard_stats,
+            ReportService.DASHBOARD_CACHE_SECONDS
+        )
+    
+    @staticmethod
+    def invalidate_report_caches():
+        """Retire every cached report after bookings or users change"""
+        cache.set('reports:generation', uuid4().hex, timeout=0)
+    
+    @staticmethod
+    def _cache_key(name):
+        """Build a report cache key tied to the current cache generation"""
+        # The token never expires, and a lost token yields a fresh one rather than an old generation
+        generation = get_or_set('reports:generation', lambda: uuid4().hex, timeout=0)
+        return f"reports:{generation}:{name}"
+    
+    @staticmethod
+    def _cached_report(name, builder, timeout):
+        """Return a cached report payload, building it on a miss"""
+        key = ReportService._cache_key(name)
+        report = cache.get(key)
+        if report is None:
+            report = builder()
+            # Only successful payloads are cached so errors are retried on the next hit
+            if report['success']:
+                cache.set(key, report, timeout=timeout)
+        return report
+    
+    @staticmethod
+    def _build_admin_dashboard_stats():
+        """Run the admin dashboard statistics queries"""
         try:
-            # User statistics
-            total_users = User.query.count()
-            total_players = Player.query.count()
-            total_owners = User.query.filter_by(user_type='owner').count()
-            active_users = User.query.filter_by(is_active=True).count()
+            # One timestamp for the whole report so every window lines up
+            now = datetime.now()
+            today = now.date()
+            week_ago = now - timedelta(days=7)
+            month_ago = now - timedelta(days=30)
             
-            # Recent registrations (last 7 days)
-            week_ago = datetime.now() - timedelta(days=7)
-            recent_users = User.query.filter(User.created_at >= week_ago).count()
+            # User statistics (recent = registered in the last 7 days)
+            user_stats = db.session.query(
+                func.count(User.id),
+                db.session.query(func.count(Player.id)).scalar_subquery(),
+                count_where(User.id, User.user_type == 'owner'),
+                count_where(User.id, User.is_active == True),
+                count_where(User.id, User.created_at >= week_ago)
+            ).one()
+            total_users, total_players, total_owners, active_users, recent_users = (
+                value or 0 for value in user_stats
+            )
             
             # Court statistics
-            total_courts = Court.query.count()
-            active_courts = Court.query.filter_by(is_active=True).count()
+            court_stats = db.session.query(
+                func.count(Court.id),
+                count_where(Court.id, Court.is_active == True)
+            ).one()
+            total_courts, active_courts = (value or 0 for value in court_stats)
             
-            # Booking statistics
-            total_bookings = Booking.query.count()
-            confirmed_bookings = Booking.query.filter_by(status='confirmed').count()
-            pending_bookings = Booking.query.filter_by(status='pending').count()
-            cancelled_bookings = Booking.query.filter_by(status='cancelled').count()
-            rejected_bookings = Booking.query.filter_by(status='rejected').count()
+            # Booking statistics, including today's bookings
+            booking_stats = db.session.query(
+                func.count(Booking.id),
+                count_where(Booking.id, Booking.status == 'confirmed'),
+                count_where(Booking.id, Booking.status == 'pending'),
+                count_where(Booking.id, Booking.status == 'cancelled'),
+                count_where(Booking.id, Booking.status == 'rejected'),
+                count_where(Booking.id, Booking.booking_date == today)
+            ).one()
+            (total_bookings, confirmed_bookings, pending_bookings,
+             cancelled_bookings, rejected_bookings, today_bookings) = (value or 0 for value in booking_stats)
             
             # Revenue statistics (last 30 days)
-            month_ago = datetime.now() - timedelta(days=30)
             monthly_revenue = db.session.query(
-                func.sum(Court.hourly_rate * 
-                        func.extract('hour', Booking.end_time - Booking.start_time))
+                func.sum(RevenueService.booking_rate_revenue_expression())
             ).join(Booking).filter(
                 Booking.status == 'confirmed',
                 Booking.booking_date >= month_ago.date()
             ).scalar() or 0
             
-            # Today's bookings
-            today_bookings = Booking.query.filter_by(
-                booking_date=datetime.now().date()
-            ).count()
-            
             # System health metrics
             avg_approval_rate = (confirmed_bookings / total_bookings * 100) if total_bookings > 0 else 0
             cancellation_rate = (cancelled_bookings / total_bookings * 100) if total_bookings > 0 else 0
@@ -124,7 +182,7 @@ class ReportService:
                         'formatted_cancellation': f"{cancellation_rate:.1f}%"
                     }
                 },
-                'generated_at': datetime.now().isoformat()
+                'generated_at': now.isoformat()
             }
             
         except Exception as e:
@@ -138,20 +196,19 @@ class ReportService:
             start_date = end_date - timedelta(days=period_days)
             
             # Build base query
+            criteria = []
             if user_id:
                 # Specific user report
                 user = User.query.get(user_id)
                 if not user:
                     return {'success': False, 'error': 'User not found'}
-                users = [user]
+                criteria.append(User.id == user_id)
                 report_type = 'individual'
                 report_title = f"Activity Report for {user.full_name}"
             else:
                 # All users of a specific type
-                query = User.query
                 if user_type:
-                    query = query.filter_by(user_type=user_type)
-                users = query.all()
+                    criteria.append(User.user_type == user_type)
                 report_type = 'group'
                 report_title = f"Activity Report - {user_type.title() if user_type else 'All'} Users"
             
@@ -162,7 +219,7 @@ class ReportService:
                     'period_days': period_days,
                     'start_date': start_date.date().isoformat(),
                     'end_date': end_date.date().isoformat(),
-                    'user_count': len(users)
+                    'user_count': 0
                 },
                 'users': []
             }
@@ -170,6 +227,32 @@ class ReportService:
             total_bookings = 0
             total_revenue = 0
             
+            # Aggregates filter on the same user population via subqueries instead of huge IN lists
+            scoped_user_ids = db.session.query(User.id).filter(*criteria)
+            scoped_player_ids = db.session.query(Player.id).filter(Player.user_id.in_(scoped_user_ids))
+            
+            player_activity = ReportService._aggregate_booking_activity(
+                Booking.player_id, scoped_player_ids, start_date, end_date
+            )
+            owner_activity = ReportService._aggregate_booking_activity(
+                Court.owner_id, scoped_user_ids, start_date, end_date
+            )
+            
+            message_counts = ReportService._aggregate_message_activity(
+                scoped_user_ids, start_date, end_date
+            )
+            
+            # Stream users in batches; profiles and courts load in one IN query per batch
+            users = User.query.filter(*criteria).options(
+                *ReportService._report_load_options(
+                    User,
+                    selectinload(User.player_profile),
+                    selectinload(User.owned_courts)
+                )
+            ).yield_per(1000)
+            
+            empty_activity = {'total': 0, 'confirmed': 0, 'cancelled': 0, 'revenue': 0}
+            
             for user in users:
                 user_data = {
                     'id': user.id,
@@ -182,65 +265,48 @@ class ReportService:
                 }
                 
                 if user.user_type == 'player':
-                    player = Player.query.filter_by(user_id=user.id).first()
+                    player = user.player_profile
                     if player:
                         # Player bookings
-                        bookings = Booking.query.filter(
-                            Booking.player_id == player.id,
-                            Booking.created_at.between(start_date, end_date)
-                        ).all()
-                        
-                        booking_revenue = sum(b.total_cost or b.calculate_cost() for b in bookings if b.status == 'confirmed')
+                        activity = player_activity.get(player.id, empty_activity)
+                        booking_revenue = activity['revenue']
                         
                         user_data['activity'] = {
-                            'total_bookings': len(bookings),
-                            'confirmed_bookings': len([b for b in bookings if b.status == 'confirmed']),
-                            'cancelled_bookings': len([b for b in bookings if b.status == 'cancelled']),
+                            'total_bookings': activity['total'],
+                            'confirmed_bookings': activity['confirmed'],
+                            'cancelled_bookings': activity['cancelled'],
                             'total_spent': float(booking_revenue),
                             'formatted_spent': f"${booking_revenue:.2f}",
-                            'avg_booking_value': float(booking_revenue / len([b for b in bookings if b.status == 'confirmed'])) if any(b.status == 'confirmed' for b in bookings) else 0,
+                            'avg_booking_value': float(booking_revenue / activity['confirmed']) if activity['confirmed'] else 0,
                             'skill_level': player.skill_level,
                             'preferred_location': player.preferred_location
                         }
                         
-                        total_bookings += len(bookings)
+                        total_bookings += activity['total']
                         total_revenue += booking_revenue
                 
                 elif user.user_type == 'owner':
                     # Owner courts and revenue
-                    courts = Court.query.filter_by(owner_id=user.id).all()
-                    
-                    owner_bookings = db.session.query(Booking).join(Court).filter(
-                        Court.owner_id == user.id,
-                        Booking.created_at.between(start_date, end_date)
-                    ).all()
-                    
-                    owner_revenue = sum(b.total_cost or b.calculate_cost() for b in owner_bookings if b.status == 'confirmed')
+                    courts = user.owned_courts
+                    activity = owner_activity.get(user.id, empty_activity)
+                    owner_revenue = activity['revenue']
                     
                     user_data['activity'] = {
                         'total_courts': len(courts),
-                        'active_courts': len([c for c in courts if c.is_active]),
-                        'total_bookings_received': len(owner_bookings),
-                        'confirmed_bookings': len([b for b in owner_bookings if b.status == 'confirmed']),
+                        'active_courts': sum(1 for c in courts if c.is_active),
+                        'total_bookings_received': activity['total'],
+                        'confirmed_bookings': activity['confirmed'],
                         'revenue_earned': float(owner_revenue),
                         'formatted_revenue': f"${owner_revenue:.2f}",
-                        'avg_booking_value': float(owner_revenue / len([b for b in owner_bookings if b.status == 'confirmed'])) if any(b.status == 'confirmed' for b in owner_bookings) else 0,
+                        'avg_booking_value': float(owner_revenue / activity['confirmed']) if activity['confirmed'] else 0,
                         'court_names': [c.name for c in courts]
                     }
                     
-                    total_bookings += len(owner_bookings)
+                    total_bookings += activity['total']
                     total_revenue += owner_revenue
                 
                 # Messages activity
-                messages_sent = Message.query.filter(
-                    Message.sender_id == user.id,
-                    Message.created_at.between(start_date, end_date)
-                ).count()
-                
-                messages_received = Message.query.filter(
-                    Message.receiver_id == user.id,
-                    Message.created_at.between(start_date, end_date)
-                ).count()
+                messages_sent, messages_received = message_counts.get(user.id, (0, 0))
                 
                 user_data['activity']['messages_sent'] = messages_sent
                 user_data['activity']['messages_received'] = messages_received
@@ -248,14 +314,24 @@ class ReportService:
                 
                 report_data['users'].append(user_data)
             
+            user_count = len(report_data['users'])
+            report_data['report_info']['user_count'] = user_count
+            
+            # Most active user by bookings made (players) or received (owners), in one pass
+            most_active = max(
+                report_data['users'],
+                key=lambda r: r['activity'].get('total_bookings') or r['activity'].get('total_bookings_received') or 0,
+                default=None
+            )
+            
             # Summary statistics
             report_data['summary'] = {
                 'total_bookings': total_bookings,
                 'total_revenue': float(total_revenue),
                 'formatted_total_revenue': f"${total_revenue:.2f}",
-                'avg_bookings_per_user': total_bookings / len(users) if users else 0,
-                'avg_revenue_per_user': float(total_revenue / len(users)) if users else 0,
-                'most_active_user': max(users, key=lambda u: sum(1 for r in report_data['users'] if r['id'] == u.id and r['activity'].get('total_bookings', 0))).full_name if users and total_bookings > 0 else None
+                'avg_bookings_per_user': total_bookings / user_count if user_count else 0,
+                'avg_revenue_per_user': float(total_revenue / user_count) if user_count else 0,
+                'most_active_user': most_active['name'] if most_active and total_bookings > 0 else None
             }
             
             return {
@@ -266,194 +342,362 @@ class ReportService:
         except Exception as e:
             return {'success': False, 'error': f'User activity report generation failed: {str(e)}'}
     
+    @staticmethod
+    def _report_load_options(entity, *eager_loads):
+        """Loader options for report queries - in dev/testing any other relationship of entity raises on access"""
+        if current_app.config.get('REPORT_RAISELOAD'):
+            return eager_loads + (Load(entity).raiseload('*'),)
+        return eager_loads
+    
+    @staticmethod
+    def _run_report_queries(*loaders):
+        """Run independent query callables, concurrently when REPORT_PARALLEL_QUERIES is enabled
+        
+        Each worker pushes its own app context, so it gets its own scoped session and connection.
+        """
+        if not current_app.config.get('REPORT_PARALLEL_QUERIES') or len(loaders) < 2:
+            return [loader() for loader in loaders]
+        
+        app = current_app._get_current_object()
+        
+        def run(loader):
+            with app.app_context():
+                return loader()
+        
+        with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+            futures = [executor.submit(run, loader) for loader in loaders]
+            return [future.result() for future in futures]
+    
+    @staticmethod
+    def _aggregate_booking_activity(key_column, key_ids, start_date, end_date):
+        """Count bookings per status and sum confirmed revenue, grouped by a player or owner key
+        
+        key_ids may be a list of ids or a query selecting them
+        """
+        activity = {}
+        rows = db.session.query(
+            key_column, Booking.status, func.count(Booking.id),
+            func.sum(RevenueService.booking_revenue_expression())
+        ).join(Court, Booking.court_id == Court.id).filter(
+            key_column.in_(key_ids),
+            Booking.created_at.between(start_date, end_date)
+        ).group_by(key_column, Booking.status).all()
+        
+        for key, status, count, cost_sum in rows:
+            stats = activity.setdefault(key, {'total': 0, 'confirmed': 0, 'cancelled': 0, 'revenue': 0})
+            stats['total'] += count
+            if status == 'confirmed':
+                stats['confirmed'] = count
+                stats['revenue'] += float(cost_sum or 0)
+            elif status == 'cancelled':
+                stats['cancelled'] = count
+        
+        return activity
+    
+    @staticmethod
+    def _aggregate_message_activity(user_ids, start_date, end_date):
+        """Sent and received message counts per user in one grouped query: {user_id: (sent, received)}"""
+        in_period = Message.created_at.between(start_date, end_date)
+        directions = union_all(
+            select(
+                Message.sender_id.label('user_id'),
+                literal(1).label('sent'),
+                literal(0).label('received')
+            ).where(Message.sender_id.in_(user_ids), in_period),
+            select(
+                Message.receiver_id.label('user_id'),
+                literal(0).label('sent'),
+                literal(1).label('received')
+            ).where(Message.receiver_id.in_(user_ids), in_period)
+        ).subquery()
+        
+        rows = db.session.query(
+            directions.c.user_id,
+            func.sum(directions.c.sent),
+            func.sum(directions.c.received)
+        ).group_by(directions.c.user_id).all()
+        
+        return {user_id: (int(sent or 0), int(received or 0)) for user_id, sent, received in rows}
+    
     @staticmethod
     def system_performance_metrics(period_days=30):
-        """Generate system performance and health metrics"""
+        """Generate system performance and health metrics (cached per period)"""
+        return ReportService._cached_report(
+            f'performance_metrics:{period_days}:{date.today().isoformat()}',
+            lambda: ReportService._build_system_performance_metrics(period_days),
+            ReportService.INSIGHTS_CACHE_SECONDS
+        )
+    
+    @staticmethod
+    def _build_system_performance_metrics(period_days):
+        """Run the system performance metrics queries"""
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=period_days)
             
+            # Daily rollups are shared across calls for the same date range
+            rollups = ReportService._get_daily_rollups(start_date.date(), end_date.date())
+            
+            statements = ReportService._report_statements()
+            params = {
+                'start_date': start_date.date(),
+                'end_date': end_date.date(),
+                'period_days': period_days
+            }
+            
+            # Court utilization rates (rates are computed by the database)
+            court_utilization = db.session.execute(statements['court_utilization'], params).all()
+            
+            # Problem areas (high cancellation rates)
+            problem_analysis = db.session.execute(statements['problem_analysis'], params).all()
+            
+            # Format the data
+            metrics = {
+                'period': {
+                    'start_date': start_date.date().isoformat(),
+                    'end_date': end_date.date().isoformat(),
+                    'days': period_days
+                },
+                'booking_trends': {
+                    'daily_data': rollups['daily_bookings']
+                },
+                'registration_trends': {
+                    'daily_data': rollups['daily_registrations']
+                },
+                'revenue_trends': {
+                    'daily_data': rollups['daily_revenue']
+                },
+                'peak_times': rollups['peak_times'],
+                'popular_locations': rollups['popular_locations'],
+                'court_performance': [
+                    {
+                        'court_id': item.id,
+                        'court_name': item.name,
+                        'location': item.location,
+                        'owner_name': item.owner_name,
+                        'total_bookings': item.total_bookings or 0,
+                        'confirmed_bookings': item.confirmed_bookings or 0,
+                        'utilization_rate': float(item.utilization_rate or 0),
+                        'approval_rate': float(item.approval_rate or 0)
+                    } for item in court_utilization
+                ],
+                'problem_areas': [
+                    {
+                        'court_id': item.id,
+                        'court_name': item.name,
+                        'location': item.location,
+                        'owner_name': item.owner_name,
+                        'total_bookings': item.total_bookings or 0,
+                        'cancelled_bookings': item.cancelled_bookings or 0,
+                        'rejected_bookings': item.rejected_bookings or 0,
+                        'problem_rate': float(item.problem_rate or 0)
+                    } for item in problem_analysis
+                ]
+            }
+            
+            return {
+                'success': True,
+                'metrics': metrics,
+                'generated_at': end_date.isoformat()
+            }
+            
+        except Exception as e:
+            return {'success': False, 'error': f'Performance metrics generation failed: {str(e)}'}
+    
+    @staticmethod
+    def _get_daily_rollups(start_date, end_date):
+        """Get daily booking, registration and revenue rollups plus hourly/location usage for a date range"""
+        def load_rollups():
+            range_start = datetime.combine(start_date, datetime.min.time())
+            range_end = datetime.combine(end_date, datetime.max.time())
+            
+            statements = ReportService._report_statements()
+            params = {
+                'start_date': start_date,
+                'end_date': end_date,
+                'range_start': range_start,
+                'range_end': range_end
+            }
+            
+            daily_bookings = db.session.execute(statements['daily_bookings'], params).all()
+            daily_registrations = db.session.execute(statements['daily_registrations'], params).all()
+            daily_revenue = db.session.execute(statements['daily_revenue'], params).all()
+            hourly_usage = db.session.execute(statements['hourly_usage'], params).all()
+            location_popularity = db.session.execute(statements['location_popularity'], params).all()
+            
+            return {
+                'daily_bookings': [
+                    {
+                        'date': str(item.date),
+                        'count': item.count,
+                        'status': item.status
+                    } for item in daily_bookings
+                ],
+                'daily_registrations': [
+                    {
+                        'date': str(item.date),
+                        'count': item.count,
+                        'user_type': item.user_type
+                    } for item in daily_registrations
+                ],
+                'daily_revenue': [
+                    {
+                        'date': str(item.date),
+                        'revenue': float(item.revenue or 0),
+                        'formatted_revenue': f"${item.revenue or 0:.2f}"
+                    } for item in daily_revenue
+                ],
+                'peak_times': [
+                    {
+                        'hour': int(item.hour),
+                        'formatted_hour': f"{int(item.hour):02d}:00",
+                        'booking_count': item.booking_count
+                    } for item in hourly_usage
+                ],
+                'popular_locations': [
+                    {
+                        'location': item.location,
+                        'booking_count': item.booking_count,
+                        'court_count': item.court_count,
+                        'avg_bookings_per_court': float(item.booking_count / item.court_count) if item.court_count > 0 else 0
+                    } for item in location_popularity
+                ]
+            }
+        
+        return get_or_set(
+            ReportService._cache_key(f'daily_rollups:{start_date.isoformat()}:{end_date.isoformat()}'),
+            load_rollups,
+            timeout=ReportService.ROLLUP_CACHE_SECONDS
+        )
+    
+    @staticmethod
+    def _report_statements():
+        """Analytics SELECTs with bind parameters, built once per database dialect and reused"""
+        dialect = db.engine.dialect.name
+        statements = ReportService._STATEMENTS.get(dialect)
+        if statements is not None:
+            return statements
+        
+        start_date = bindparam('start_date', type_=Date)
+        end_date = bindparam('end_date', type_=Date)
+        range_start = bindparam('range_start', type_=DateTime)
+        range_end = bindparam('range_end', type_=DateTime)
+        period_days = bindparam('period_days', type_=Integer)
+        
+        total_bookings = func.count(Booking.id)
+        confirmed_count = count_where(Booking.id, Booking.status == 'confirmed')
+        
+        statements = {
             # Booking trends
-            daily_bookings = db.session.query(
+            'daily_bookings': select(
                 func.date(Booking.created_at).label('date'),
                 func.count(Booking.id).label('count'),
                 Booking.status
-            ).filter(
-                Booking.created_at.between(start_date, end_date)
+            ).where(
+                Booking.created_at.between(range_start, range_end)
             ).group_by(
                 func.date(Booking.created_at),
                 Booking.status
-            ).order_by('date').all()
+            ).order_by('date'),
             
             # User registration trends
-            daily_registrations = db.session.query(
+            'daily_registrations': select(
                 func.date(User.created_at).label('date'),
                 func.count(User.id).label('count'),
                 User.user_type
-            ).filter(
-                User.created_at.between(start_date, end_date)
+            ).where(
+                User.created_at.between(range_start, range_end)
             ).group_by(
                 func.date(User.created_at),
                 User.user_type
-            ).order_by('date').all()
+            ).order_by('date'),
             
             # Revenue trends
-            daily_revenue = db.session.query(
+            'daily_revenue': select(
                 func.date(Booking.booking_date).label('date'),
-                func.sum(Court.hourly_rate * 
-                        func.extract('hour', Booking.end_time - Booking.start_time)).label('revenue')
-            ).join(Court).filter(
+                func.sum(RevenueService.booking_rate_revenue_expression()).label('revenue')
+            ).join_from(Booking, Court).where(
                 Booking.status == 'confirmed',
-                Booking.booking_date.between(start_date.date(), end_date.date())
-            ).group_by(func.date(Booking.booking_date)).order_by('date').all()
+                Booking.booking_date.between(start_date, end_date)
+            ).group_by(func.date(Booking.booking_date)).order_by('date'),
             
             # Peak usage times
-            hourly_usage = db.session.query(
+            'hourly_usage': select(
                 func.extract('hour', Booking.start_time).label('hour'),
                 func.count(Booking.id).label('booking_count')
-            ).filter(
+            ).where(
                 Booking.status == 'confirmed',
-                Booking.booking_date.between(start_date.date(), end_date.date())
-            ).group_by(func.extract('hour', Booking.start_time)).all()
+                Booking.booking_date.between(start_date, end_date)
+            ).group_by(func.extract('hour', Booking.start_time)),
             
             # Popular locations
-            location_popularity = db.session.query(
+            'location_popularity': select(
                 Court.location,
                 func.count(Booking.id).label('booking_count'),
                 func.count(func.distinct(Court.id)).label('court_count')
-            ).join(Booking).filter(
+            ).join_from(Court, Booking).where(
                 Booking.status == 'confirmed',
-                Booking.booking_date.between(start_date.date(), end_date.date())
+                Booking.booking_date.between(start_date, end_date)
             ).group_by(Court.location).order_by(
                 func.count(Booking.id).desc()
-            ).all()
+            ),
             
-            # Court utilization rates
-            court_utilization = db.session.query(
+            # Court utilization rates (rates are computed by the database)
+            'court_utilization': select(
                 Court.id,
                 Court.name,
                 Court.location,
                 User.full_name.label('owner_name'),
-                func.count(Booking.id).label('total_bookings'),
-                func.sum(
-                    func.case([(Booking.status == 'confirmed', 1)], else_=0)
-                ).label('confirmed_bookings')
-            ).join(User, Court.owner_id == User.id).outerjoin(
+                total_bookings.label('total_bookings'),
+                confirmed_count.label('confirmed_bookings'),
+                (func.coalesce(confirmed_count, 0) * 7.0 / period_days).label('utilization_rate'),  # bookings per week
+                func.coalesce(
+                    confirmed_count * 100.0 / func.nullif(total_bookings, 0), 0
+                ).label('approval_rate')
+            ).join_from(Court, User, Court.owner_id == User.id).outerjoin(
                 Booking, and_(
                     Booking.court_id == Court.id,
-                    Booking.booking_date.between(start_date.date(), end_date.date())
+                    Booking.booking_date.between(start_date, end_date)
                 )
             ).group_by(
                 Court.id, Court.name, Court.location, User.full_name
-            ).order_by(func.count(Booking.id).desc()).all()
+            ).order_by(total_bookings.desc()),
             
             # Problem areas (high cancellation rates)
-            problem_analysis = db.session.query(
+            'problem_analysis': select(
                 Court.id,
                 Court.name,
                 Court.location,
                 User.full_name.label('owner_name'),
-                func.count(Booking.id).label('total_bookings'),
-                func.sum(
-                    func.case([(Booking.status == 'cancelled', 1)], else_=0)
-                ).label('cancelled_bookings'),
-                func.sum(
-                    func.case([(Booking.status == 'rejected', 1)], else_=0)
-                ).label('rejected_bookings')
-            ).join(User, Court.owner_id == User.id).outerjoin(Booking).filter(
-                Booking.booking_date.between(start_date.date(), end_date.date())
+                total_bookings.label('total_bookings'),
+                count_where(Booking.id, Booking.status == 'cancelled').label('cancelled_bookings'),
+                count_where(Booking.id, Booking.status == 'rejected').label('rejected_bookings'),
+                (count_where(Booking.id, Booking.status.in_(['cancelled', 'rejected'])) * 100.0 / func.nullif(total_bookings, 0)).label('problem_rate')
+            ).join_from(Court, User, Court.owner_id == User.id).outerjoin(Booking).where(
+                Booking.booking_date.between(start_date, end_date)
             ).group_by(
                 Court.id, Court.name, Court.location, User.full_name
-            ).having(func.count(Booking.id) > 5).all()
-            
-            # Format the data
-            metrics = {
-                'period': {
-                    'start_date': start_date.date().isoformat(),
-                    'end_date': end_date.date().isoformat(),
-                    'days': period_days
-                },
-                'booking_trends': {
-                    'daily_data': [
-                        {
-                            'date': str(item.date),
-                            'count': item.count,
-                            'status': item.status
-                        } for item in daily_bookings
-                    ]
-                },
-                'registration_trends': {
-                    'daily_data': [
-                        {
-                            'date': str(item.date),
-                            'count': item.count,
-                            'user_type': item.user_type
-                        } for item in daily_registrations
-                    ]
-                },
-                'revenue_trends': {
-                    'daily_data': [
-                        {
-                            'date': str(item.date),
-                            'revenue': float(item.revenue or 0),
-                            'formatted_revenue': f"${item.revenue or 0:.2f}"
-                        } for item in daily_revenue
-                    ]
-                },
-                'peak_times': [
-                    {
-                        'hour': int(item.hour),
-                        'formatted_hour': f"{int(item.hour):02d}:00",
-                        'booking_count': item.booking_count
-                    } for item in hourly_usage
-                ],
-                'popular_locations': [
-                    {
-                        'location': item.location,
-                        'booking_count': item.booking_count,
-                        'court_count': item.court_count,
-                        'avg_bookings_per_court': float(item.booking_count / item.court_count) if item.court_count > 0 else 0
-                    } for item in location_popularity
-                ],
-                'court_performance': [
-                    {
-                        'court_id': item.id,
-                        'court_name': item.name,
-                        'location': item.location,
-                        'owner_name': item.owner_name,
-                        'total_bookings': item.total_bookings or 0,
-                        'confirmed_bookings': item.confirmed_bookings or 0,
-                        'utilization_rate': float((item.confirmed_bookings or 0) / period_days * 7),  # bookings per week
-                        'approval_rate': float((item.confirmed_bookings or 0) / (item.total_bookings or 1) * 100)
-                    } for item in court_utilization
-                ],
-                'problem_areas': [
-                    {
-                        'court_id': item.id,
-                        'court_name': item.name,
-                        'location': item.location,
-                        'owner_name': item.owner_name,
-                        'total_bookings': item.total_bookings or 0,
-                        'cancelled_bookings': item.cancelled_bookings or 0,
-                        'rejected_bookings': item.rejected_bookings or 0,
-                        'problem_rate': float(((item.cancelled_bookings or 0) + (item.rejected_bookings or 0)) / (item.total_bookings or 1) * 100)
-                    } for item in problem_analysis
-                ]
-            }
-            
-            return {
-                'success': True,
-                'metrics': metrics,
-                'generated_at': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {'success': False, 'error': f'Performance metrics generation failed: {str(e)}'}
+            ).having(total_bookings > 5)
+        }
+        
+        ReportService._STATEMENTS[dialect] = statements
+        return statements
     
     @staticmethod
     def generate_business_insights(period_days=90):
-        """Generate business insights and recommendations"""
+        """Generate business insights and recommendations (cached per period)"""
+        return ReportService._cached_report(
+            f'business_insights:{period_days}:{date.today().isoformat()}',
+            lambda: ReportService._build_business_insights(period_days),
+            ReportService.BUSINESS_INSIGHTS_CACHE_SECONDS
+        )
+    
+    @staticmethod
+    def _build_business_insights(period_days):
+        """Derive business insights from the performance metrics"""
         try:
+            now = datetime.now()
+            
             # Get performance metrics as base data
             performance = ReportService.system_performance_metrics(period_days)
             if not performance['success']:
@@ -470,8 +714,12 @@ class ReportService:
             }
             
             # Analyze booking trends
-            total_bookings = sum(item['count'] for item in metrics['booking_trends']['daily_data'])
-            confirmed_bookings = sum(item['count'] for item in metrics['booking_trends']['daily_data'] if item['status'] == 'confirmed')
+            booking_totals = defaultdict(int)
+            for item in metrics['booking_trends']['daily_data']:
+                booking_totals['all'] += item['count']
+                booking_totals[item['status']] += item['count']
+            total_bookings = booking_totals['all']
+            confirmed_bookings = booking_totals['confirmed']
             
             if total_bookings > 0:
                 approval_rate = (confirmed_bookings / total_bookings) * 100
@@ -536,8 +784,15 @@ class ReportService:
             
             # Analyze court utilization
             if metrics['court_performance']:
-                high_performers = [court for court in metrics['court_performance'] if court['approval_rate'] > 90 and court['total_bookings'] > 10]
-                low_performers = [court for court in metrics['court_performance'] if court['approval_rate'] < 70 and court['total_bookings'] > 5]
+                # Bucket courts in one pass
+                performance_buckets = defaultdict(list)
+                for court in metrics['court_performance']:
+                    if court['approval_rate'] > 90 and court['total_bookings'] > 10:
+                        performance_buckets['high'].append(court)
+                    elif court['approval_rate'] < 70 and court['total_bookings'] > 5:
+                        performance_buckets['low'].append(court)
+                high_performers = performance_buckets['high']
+                low_performers = performance_buckets['low']
                 
                 if high_performers:
                     insights['key_insights'].append({
@@ -574,10 +829,19 @@ class ReportService:
                         'recommendation': 'Urgent review needed - these courts may harm platform reputation'
                     })
             
-            # Revenue analysis
-            total_revenue = sum(item['revenue'] for item in metrics['revenue_trends']['daily_data'])
-            if metrics['revenue_trends']['daily_data']:
-                avg_daily_revenue = total_revenue / len(metrics['revenue_trends']['daily_data'])
+            # Revenue analysis - totals, first week and last week in one pass
+            revenue_days = metrics['revenue_trends']['daily_data']
+            total_revenue = 0
+            early_days = []  # First week
+            recent_days = deque(maxlen=7)  # Last week
+            for day in revenue_days:
+                total_revenue += day['revenue']
+                if len(early_days) < 7:
+                    early_days.append(day)
+                recent_days.append(day)
+            
+            if revenue_days:
+                avg_daily_revenue = total_revenue / len(revenue_days)
                 
                 insights['key_insights'].append({
                     'type': 'financial',
@@ -587,9 +851,6 @@ class ReportService:
                 })
                 
                 # Check revenue trends
-                recent_days = metrics['revenue_trends']['daily_data'][-7:]  # Last week
-                early_days = metrics['revenue_trends']['daily_data'][:7]   # First week
-                
                 if len(recent_days) >= 7 and len(early_days) >= 7:
                     recent_avg = sum(day['revenue'] for day in recent_days) / len(recent_days)
                     early_avg = sum(day['revenue'] for day in early_days) / len(early_days)
@@ -640,7 +901,7 @@ class ReportService:
             return {
                 'success': True,
                 'insights': insights,
-                'generated_at': datetime.now().isoformat()
+                'generated_at': now.isoformat()
             }
             
         except Exception as e:
@@ -648,7 +909,17 @@ class ReportService:
     
     @staticmethod
     def export_report_data(report_type, **kwargs):
-        """Export report data in various formats (JSON, CSV data structure)"""
+        """Export report data in various formats (JSON, CSV data structure), cached per report type and parameters"""
+        parameters = ','.join(f'{key}={value}' for key, value in sorted(kwargs.items()))
+        return ReportService._cached_report(
+            f'export:{report_type}:{parameters}',
+            lambda: ReportService._build_export_report_data(report_type, **kwargs),
+            ReportService.EXPORT_CACHE_SECONDS
+        )
+    
+    @staticmethod
+    def _build_export_report_data(report_type, **kwargs):
+        """Build the export payload for a report"""
         try:
             if report_type == 'admin_dashboard':
                 data = ReportService.generate_admin_dashboard_stats()
@@ -665,9 +936,10 @@ class ReportService:
                 return data
             
             # Prepare export data
+            now = datetime.now()
             export_data = {
                 'report_type': report_type,
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': now.isoformat(),
                 'parameters': kwargs,
                 'data': data
             }
@@ -675,7 +947,7 @@ class ReportService:
             return {
                 'success': True,
                 'export_data': export_data,
-                'filename_suggestion': f"tennis_matchup_{report_type}_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
+                'filename_suggestion': f"tennis_matchup_{report_type}_{now.strftime('%Y%m%d_%H%M')}.json"
             }
             
         except Exception as e:
@@ -683,58 +955,122 @@ class ReportService:
     
     @staticmethod
     def get_top_performers(period_days=30, limit=10):
-        """Get top performing users, courts, and metrics"""
+        """Get top performing users, courts, and metrics (cached per period and limit)"""
+        return ReportService._cached_report(
+            f'top_performers:{period_days}:{limit}:{date.today().isoformat()}',
+            lambda: ReportService._build_top_performers(period_days, limit),
+            ReportService.INSIGHTS_CACHE_SECONDS
+        )
+    
+    @staticmethod
+    def _build_top_performers(period_days, limit):
+        """Run the top performers queries"""
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=period_days)
             
             # Top players by booking count
-            top_players = db.session.query(
-                Player.id,
-                User.full_name,
-                User.email,
-                func.count(Booking.id).label('booking_count'),
-                func.sum(Booking.total_cost).label('total_spent')
-            ).join(User).join(Booking).filter(
-                Booking.created_at.between(start_date, end_date)
-            ).group_by(
-                Player.id, User.full_name, User.email
-            ).order_by(func.count(Booking.id).desc()).limit(limit).all()
+            def load_top_players():
+                return db.session.query(
+                    Player.id,
+                    User.full_name,
+                    User.email,
+                    func.count(Booking.id).label('booking_count'),
+                    func.sum(Booking.total_cost).label('total_spent')
+                ).join(User).join(Booking).filter(
+                    Booking.created_at.between(start_date, end_date)
+                ).group_by(
+                    Player.id, User.full_name, User.email
+                ).order_by(func.count(Booking.id).desc()).limit(limit).all()
             
-            # Top courts by revenue
-            top_courts = db.session.query(
-                Court.id,
-                Court.name,
-                Court.location,
-                User.full_name.label('owner_name'),
-                func.count(Booking.id).label('booking_count'),
-                func.sum(Court.hourly_rate * 
-                        func.extract('hour', Booking.end_time - Booking.start_time)).label('revenue')
-            ).join(User, Court.owner_id == User.id).join(Booking).filter(
+            # Revenue per confirmed booking, computed once and shared by the court and owner rankings
+            booking_revenue = db.session.query(
+                Booking.id.label('booking_id'),
+                Booking.court_id,
+                Court.owner_id,
+                RevenueService.booking_rate_revenue_expression().label('revenue')
+            ).join(Court).filter(
                 Booking.status == 'confirmed',
                 Booking.booking_date.between(start_date.date(), end_date.date())
-            ).group_by(
-                Court.id, Court.name, Court.location, User.full_name
-            ).order_by(func.sum(Court.hourly_rate * 
-                              func.extract('hour', Booking.end_time - Booking.start_time)).desc()).limit(limit).all()
+            ).cte('booking_revenue')
+            
+            # Top courts by revenue
+            def load_top_courts():
+                return db.session.query(
+                    Court.id,
+                    Court.name,
+                    Court.location,
+                    User.full_name.label('owner_name'),
+                    func.count(booking_revenue.c.booking_id).label('booking_count'),
+                    func.sum(booking_revenue.c.revenue).label('revenue')
+                ).select_from(booking_revenue).join(
+                    Court, Court.id == booking_revenue.c.court_id
+                ).join(User, Court.owner_id == User.id).group_by(
+                    Court.id, Court.name, Court.location, User.full_name
+                ).order_by(desc('revenue')).limit(limit).all()
             
             # Top owners by revenue
-            top_owners = db.session.query(
-                User.id,
-                User.full_name,
-                User.email,
-                func.count(func.distinct(Court.id)).label('court_count'),
-                func.count(Booking.id).label('total_bookings'),
-                func.sum(Court.hourly_rate * 
-                        func.extract('hour', Booking.end_time - Booking.start_time)).label('total_revenue')
-            ).join(Court, User.id == Court.owner_id).join(Booking).filter(
-                User.user_type == 'owner',
-                Booking.status == 'confirmed',
-                Booking.booking_date.between(start_date.date(), end_date.date())
-            ).group_by(
-                User.id, User.full_name, User.email
-            ).order_by(func.sum(Court.hourly_rate * 
-                              func.extract('hour', Booking.end_time - Booking.start_time)).desc()).limit(limit).all()
+            def load_top_owners():
+                return db.session.query(
+                    User.id,
+                    User.full_name,
+                    User.email,
+                    func.count(func.distinct(booking_revenue.c.court_id)).label('court_count'),
+                    func.count(booking_revenue.c.booking_id).label('total_bookings'),
+                    func.sum(booking_revenue.c.revenue).label('total_revenue')
+                ).select_from(booking_revenue).join(
+                    User, User.id == booking_revenue.c.owner_id
+                ).filter(
+                    User.user_type == 'owner'
+                ).group_by(
+                    User.id, User.full_name, User.email
+                ).order_by(desc('total_revenue')).limit(limit).all()
+            
+            top_players, top_courts, top_owners = ReportService._run_report_queries(
+                load_top_players, load_top_courts, load_top_owners
+            )
+            
+            # Sums come back as Decimal on PostgreSQL; coerce each once and reuse the float
+            players_data = []
+            for p in top_players:
+                total_spent = float(p.total_spent or 0)
+                players_data.append({
+                    'id': p.id,
+                    'name': p.full_name,
+                    'email': p.email,
+                    'booking_count': p.booking_count,
+                    'total_spent': total_spent,
+                    'formatted_spent': f"${total_spent:.2f}",
+                    'avg_booking_value': total_spent / p.booking_count if p.booking_count > 0 else 0
+                })
+            
+            courts_data = []
+            for c in top_courts:
+                revenue = float(c.revenue or 0)
+                courts_data.append({
+                    'id': c.id,
+                    'name': c.name,
+                    'location': c.location,
+                    'owner_name': c.owner_name,
+                    'booking_count': c.booking_count,
+                    'revenue': revenue,
+                    'formatted_revenue': f"${revenue:.2f}",
+                    'avg_booking_value': revenue / c.booking_count if c.booking_count > 0 else 0
+                })
+            
+            owners_data = []
+            for o in top_owners:
+                total_revenue = float(o.total_revenue or 0)
+                owners_data.append({
+                    'id': o.id,
+                    'name': o.full_name,
+                    'email': o.email,
+                    'court_count': o.court_count,
+                    'total_bookings': o.total_bookings,
+                    'total_revenue': total_revenue,
+                    'formatted_revenue': f"${total_revenue:.2f}",
+                    'avg_revenue_per_court': total_revenue / o.court_count if o.court_count > 0 else 0
+                })
             
             return {
                 'success': True,
@@ -743,41 +1079,9 @@ class ReportService:
                     'start_date': start_date.date().isoformat(),
                     'end_date': end_date.date().isoformat()
                 },
-                'top_players': [
-                    {
-                        'id': p.id,
-                        'name': p.full_name,
-                        'email': p.email,
-                        'booking_count': p.booking_count,
-                        'total_spent': float(p.total_spent or 0),
-                        'formatted_spent': f"${p.total_spent or 0:.2f}",
-                        'avg_booking_value': float((p.total_spent or 0) / p.booking_count) if p.booking_count > 0 else 0
-                    } for p in top_players
-                ],
-                'top_courts': [
-                    {
-                        'id': c.id,
-                        'name': c.name,
-                        'location': c.location,
-                        'owner_name': c.owner_name,
-                        'booking_count': c.booking_count,
-                        'revenue': float(c.revenue or 0),
-                        'formatted_revenue': f"${c.revenue or 0:.2f}",
-                        'avg_booking_value': float((c.revenue or 0) / c.booking_count) if c.booking_count > 0 else 0
-                    } for c in top_courts
-                ],
-                'top_owners': [
-                    {
-                        'id': o.id,
-                        'name': o.full_name,
-                        'email': o.email,
-                        'court_count': o.court_count,
-                        'total_bookings': o.total_bookings,
-                        'total_revenue': float(o.total_revenue or 0),
-                        'formatted_revenue': f"${o.total_revenue or 0:.2f}",
-                        'avg_revenue_per_court': float((o.total_revenue or 0) / o.court_count) if o.court_count > 0 else 0
-                    } for o in top_owners
-                ]
+                'top_players': players_data,
+                'top_courts': courts_data,
+                'top_owners': owners_data
             }
             
         except Exception as e:
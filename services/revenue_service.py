@@ -7,24 +7,107 @@ from models.database import db
 from models.user import User
 from models.player import Player
 from models.court import Court, Booking
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case, cast, select, Integer
 from collections import defaultdict
+from flask import g, has_app_context
+from utils.cache import cache, get_or_set, invalidate
+from utils.db_helpers import count_where
+from uuid import uuid4
 import calendar
 
+# Locale-independent name lookups for per-row loops (cheaper than strftime)
+WEEKDAY_NAMES = tuple(calendar.day_name)
+MONTH_NAMES = tuple(calendar.month_name)
+
+# Revenue trend by month-over-month percentage change: (exclusive lower bound, trend, icon, color)
+TREND_TABLE = (
+    (10, 'strong_growth', '📈', 'success'),
+    (0, 'growth', '📊', 'success'),
+    (-10, 'stable', '📊', 'warning'),
+    (float('-inf'), 'decline', '📉', 'danger'),
+)
+
 
 class RevenueService:
     """Centralized revenue and financial analytics service"""
     
+    # Totals for months that have already ended change rarely, so they are kept for a day
+    CLOSED_MONTH_CACHE_SECONDS = 86400
+    
+    @staticmethod
+    def booking_hours_expression():
+        """SQL expression for a booking's duration in hours (stored on every booking at flush time)"""
+        return Booking.duration_hours
+    
+    @staticmethod
+    def booking_revenue_expression():
+        """SQL expression for a booking's revenue (total_cost is stored on every booking at flush time)"""
+        return func.coalesce(Booking.total_cost, 0)
+    
+    @staticmethod
+    def booking_rate_revenue_expression():
+        """SQL expression for a booking's revenue at the court's hourly rate (query must join Court)"""
+        return Court.hourly_rate * RevenueService.booking_hours_expression()
+    
     @staticmethod
     def calculate_monthly_revenue(owner_id, month=None, year=None):
-        """Calculate revenue for a specific month"""
+        """Calculate revenue for a specific month (memoized for the current request)"""
+        # Default to current month if not specified
+        if month is None:
+            month = datetime.now().month
+        if year is None:
+            year = datetime.now().year
+        
+        # Dashboard, comparison and prediction ask for the same months within one request
+        if not has_app_context():
+            return RevenueService._calculate_monthly_revenue(owner_id, month, year)
+        
+        memo = g.setdefault('monthly_revenue_memo', {})
+        key = (owner_id, month, year)
+        if key not in memo:
+            result = RevenueService._calculate_monthly_revenue(owner_id, month, year)
+            if not result['success']:
+                return result
+            memo[key] = result
+        return memo[key]
+    
+    @staticmethod
+    def get_owner_courts(owner_id):
+        """Get all courts of an owner, loaded once per request"""
+        if not has_app_context():
+            return Court.query.filter_by(owner_id=owner_id).all()
+        
+        memo = g.setdefault('owner_courts_memo', {})
+        if owner_id not in memo:
+            memo[owner_id] = Court.query.filter_by(owner_id=owner_id).all()
+        return memo[owner_id]
+    
+    @staticmethod
+    def invalidate_monthly_revenue(owner_id=None, booking_date=None):
+        """Forget memoized monthly revenue after a booking status change (and the cached closed month it falls in)"""
+        if has_app_context():
+            g.pop('monthly_revenue_memo', None)
+        if owner_id is not None and booking_date is not None:
+            invalidate(RevenueService._monthly_cache_key(owner_id, booking_date.year, booking_date.month))
+    
+    @staticmethod
+    def invalidate_owner_revenue(owner_id):
+        """Retire every cached month of an owner after a court's rate changes or a court is deleted"""
+        if has_app_context():
+            g.pop('monthly_revenue_memo', None)
+        cache.set(f'revenue:generation:{owner_id}', uuid4().hex, timeout=0)
+    
+    @staticmethod
+    def _monthly_cache_key(owner_id, year, month):
+        """Cache key for an owner's closed-month totals, tied to the owner's current cache generation"""
+        # The token never expires; a lost token yields a fresh one, so retired months cannot come back
+        generation = get_or_set(f'revenue:generation:{owner_id}', lambda: uuid4().hex, timeout=0)
+        return f'revenue:monthly:{owner_id}:{generation}:{year}:{month}'
+    
+    @staticmethod
+    def _calculate_monthly_revenue(owner_id, month, year):
+        """Run the monthly revenue queries"""
         try:
-            # Default to current month if not specified
-            if month is None:
-                month = datetime.now().month
-            if year is None:
-                year = datetime.now().year
-            
             # Get first and last day of the month
             first_day = date(year, month, 1)
             if month == 12:
@@ -32,32 +115,33 @@ class RevenueService:
             else:
                 last_day = date(year, month + 1, 1) - timedelta(days=1)
             
-            # Calculate revenue from confirmed bookings
-            revenue_query = db.session.query(
-                func.sum(
-                    Court.hourly_rate * 
-                    func.extract('hour', Booking.end_time - Booking.start_time)
-                ).label('total_revenue')
-            ).join(Court).filter(
-                Court.owner_id == owner_id,
-                Booking.status == 'confirmed',
-                Booking.booking_date.between(first_day, last_day)
-            ).first()
-            
-            total_revenue = revenue_query.total_revenue or 0
-            
-            # Count bookings
-            booking_count = db.session.query(Booking).join(Court).filter(
-                Court.owner_id == owner_id,
-                Booking.status == 'confirmed',
-                Booking.booking_date.between(first_day, last_day)
-            ).count()
+            def load_totals():
+                # Revenue and booking count from confirmed bookings in one query
+                totals = db.session.query(
+                    func.sum(RevenueService.booking_rate_revenue_expression()).label('total_revenue'),
+                    func.count(Booking.id).label('booking_count')
+                ).select_from(Booking).join(Court).filter(
+                    Court.owner_id == owner_id,
+                    Booking.status == 'confirmed',
+                    Booking.booking_date.between(first_day, last_day)
+                ).one()
+                return float(totals.total_revenue or 0), totals.booking_count
+            
+            if last_day < date.today():
+                # Closed months come from the shared cache; the current month is always live
+                total_revenue, booking_count = get_or_set(
+                    RevenueService._monthly_cache_key(owner_id, year, month),
+                    load_totals,
+                    timeout=RevenueService.CLOSED_MONTH_CACHE_SECONDS
+                )
+            else:
+                total_revenue, booking_count = load_totals()
             
             return {
                 'success': True,
                 'month': month,
                 'year': year,
-                'month_name': calendar.month_name[month],
+                'month_name': MONTH_NAMES[month],
                 'total_revenue': float(total_revenue),
                 'formatted_revenue': f"${total_revenue:.2f}",
                 'booking_count': booking_count,
@@ -78,64 +162,63 @@ class RevenueService:
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=period_days)
             
-            # Get all confirmed bookings in period
-            bookings = db.session.query(Booking).join(Court).filter(
+            # Confirmed bookings in period - aggregated in the database, never loaded as objects
+            revenue = func.sum(RevenueService.booking_revenue_expression())
+            bookings = func.count(Booking.id)
+            confirmed_in_period = and_(
                 Court.owner_id == owner_id,
                 Booking.status == 'confirmed',
                 Booking.booking_date.between(start_date, end_date)
-            ).all()
+            )
             
-            # Calculate basic metrics
-            total_revenue = sum(b.total_cost or b.calculate_cost() for b in bookings)
-            total_bookings = len(bookings)
-            avg_booking_value = total_revenue / total_bookings if total_bookings > 0 else 0
+            # Court and hour breakdowns come back ordered by revenue, so their top rows are the top performers
+            by_court = db.session.query(
+                Court.name, revenue, bookings
+            ).join(Booking).filter(confirmed_in_period).group_by(
+                Court.name
+            ).order_by(revenue.desc(), func.min(Court.id)).all()
+            
+            hour = cast(func.extract('hour', Booking.start_time), Integer)
+            by_hour = db.session.query(
+                hour, revenue
+            ).join(Court).filter(confirmed_in_period).group_by(hour).order_by(revenue.desc(), hour).all()
+            
+            # Daily rows are few enough to fold into weekday/month in Python
+            by_date = db.session.query(
+                Booking.booking_date, revenue, bookings
+            ).join(Court).filter(confirmed_in_period).group_by(Booking.booking_date).all()
             
             # Revenue by court
-            court_revenue = defaultdict(float)
-            court_bookings = defaultdict(int)
-            for booking in bookings:
-                court_key = booking.court.name
-                court_revenue[court_key] += booking.total_cost or booking.calculate_cost()
-                court_bookings[court_key] += 1
-            
-            # Revenue by day of week
+            court_revenue = {}
+            court_bookings = {}
+            for court_name, court_total, court_count in by_court:
+                court_revenue[court_name] = float(court_total or 0)
+                court_bookings[court_name] = court_count
+            
+            # Revenue by day of week, plus monthly trends (if period is long enough)
+            total_revenue = 0
+            total_bookings = 0
             weekday_revenue = defaultdict(float)
             weekday_bookings = defaultdict(int)
-            for booking in bookings:
-                day_name = booking.booking_date.strftime('%A')
-                weekday_revenue[day_name] += booking.total_cost or booking.calculate_cost()
-                weekday_bookings[day_name] += 1
+            monthly_data = defaultdict(float)
+            for booking_date, day_total, day_count in by_date:
+                day_total = float(day_total or 0)
+                total_revenue += day_total
+                total_bookings += day_count
+                day_name = WEEKDAY_NAMES[booking_date.weekday()]
+                weekday_revenue[day_name] += day_total
+                weekday_bookings[day_name] += day_count
+                monthly_data[f"{booking_date.year:04d}-{booking_date.month:02d}"] += day_total
+            
+            avg_booking_value = total_revenue / total_bookings if total_bookings > 0 else 0
+            monthly_trends = dict(sorted(monthly_data.items())) if period_days >= 30 else {}
             
             # Revenue by hour
-            hourly_revenue = defaultdict(float)
-            hourly_bookings = defaultdict(int)
-            for booking in bookings:
-                hour = booking.start_time.hour
-                hourly_revenue[hour] += booking.total_cost or booking.calculate_cost()
-                hourly_bookings[hour] += 1
-            
-            # Monthly trends (if period is long enough)
-            monthly_trends = {}
-            if period_days >= 30:
-                monthly_data = defaultdict(float)
-                for booking in bookings:
-                    month_key = booking.booking_date.strftime('%Y-%m')
-                    monthly_data[month_key] += booking.total_cost or booking.calculate_cost()
-                monthly_trends = dict(sorted(monthly_data.items()))
-            
-            # Top performing courts
-            top_courts = sorted(
-                [(court, revenue) for court, revenue in court_revenue.items()],
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
-            
-            # Peak hours
-            peak_hours = sorted(
-                [(hour, revenue) for hour, revenue in hourly_revenue.items()],
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
+            hourly_revenue = {slot_hour: float(slot_total or 0) for slot_hour, slot_total in by_hour}
+            
+            # Top performing courts and peak hours
+            top_courts = list(court_revenue.items())[:5]
+            peak_hours = list(hourly_revenue.items())[:5]
             
             return {
                 'success': True,
@@ -182,57 +265,81 @@ class RevenueService:
             if isinstance(end_date, str):
                 end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
             
-            # Get all bookings in period (all statuses)
-            all_bookings = db.session.query(Booking).join(Court).filter(
-                Court.owner_id == owner_id,
-                Booking.booking_date.between(start_date, end_date)
-            ).all()
-            
-            # Categorize bookings by status
-            confirmed_bookings = [b for b in all_bookings if b.status == 'confirmed']
-            pending_bookings = [b for b in all_bookings if b.status == 'pending']
-            cancelled_bookings = [b for b in all_bookings if b.status == 'cancelled']
-            rejected_bookings = [b for b in all_bookings if b.status == 'rejected']
-            
-            # Calculate revenues
-            confirmed_revenue = sum(b.total_cost or b.calculate_cost() for b in confirmed_bookings)
-            potential_revenue = sum(b.total_cost or b.calculate_cost() for b in pending_bookings)
-            lost_revenue = sum(b.total_cost or b.calculate_cost() for b in cancelled_bookings + rejected_bookings)
-            
-            # Calculate metrics
-            total_requests = len(all_bookings)
-            approval_rate = (len(confirmed_bookings) / total_requests * 100) if total_requests > 0 else 0
-            cancellation_rate = (len(cancelled_bookings) / total_requests * 100) if total_requests > 0 else 0
-            
-            # Court performance
+            # One grouped row per owner court (including courts without bookings) with status counts and revenues
+            is_confirmed = Booking.status == 'confirmed'
+            is_pending = Booking.status == 'pending'
+            is_lost = Booking.status.in_(['cancelled', 'rejected'])
+            revenue = RevenueService.booking_revenue_expression()
+            court_rows = db.session.query(
+                Court.name,
+                func.count(Booking.id).label('total_bookings'),
+                count_where(Booking.id, is_confirmed).label('confirmed_bookings'),
+                count_where(Booking.id, is_pending).label('pending_bookings'),
+                count_where(Booking.id, Booking.status == 'cancelled').label('cancelled_bookings'),
+                count_where(Booking.id, Booking.status == 'rejected').label('rejected_bookings'),
+                func.sum(case((is_confirmed, revenue), else_=0)).label('confirmed_revenue'),
+                func.sum(case((is_pending, revenue), else_=0)).label('potential_revenue'),
+                func.sum(case((is_lost, revenue), else_=0)).label('lost_revenue')
+            ).outerjoin(
+                Booking, and_(
+                    Booking.court_id == Court.id,
+                    Booking.booking_date.between(start_date, end_date)
+                )
+            ).filter(
+                Court.owner_id == owner_id
+            ).group_by(Court.id, Court.name).order_by(Court.id).all()
+            
+            # Calculate utilization (simplified: bookings per week)
+            weeks_in_period = max(1, (end_date - start_date).days / 7)
+            
+            # Court performance, accumulating the report totals on the way
             court_performance = {}
-            owner_courts = Court.query.filter_by(owner_id=owner_id).all()
-            
-            for court in owner_courts:
-                court_bookings = [b for b in all_bookings if b.court_id == court.id]
-                court_confirmed = [b for b in court_bookings if b.status == 'confirmed']
-                court_revenue = sum(b.total_cost or b.calculate_cost() for b in court_confirmed)
+            status_counts = defaultdict(int)
+            confirmed_revenue = potential_revenue = lost_revenue = 0.0
+            for row in court_rows:
+                court_revenue = float(row.confirmed_revenue or 0)
+                confirmed = row.confirmed_bookings or 0
                 
-                # Calculate utilization (simplified: bookings per week)
-                weeks_in_period = max(1, (end_date - start_date).days / 7)
-                utilization_rate = len(court_confirmed) / weeks_in_period
+                status_counts['total'] += row.total_bookings
+                status_counts['confirmed'] += confirmed
+                status_counts['pending'] += row.pending_bookings or 0
+                status_counts['cancelled'] += row.cancelled_bookings or 0
+                status_counts['rejected'] += row.rejected_bookings or 0
+                confirmed_revenue += court_revenue
+                potential_revenue += float(row.potential_revenue or 0)
+                lost_revenue += float(row.lost_revenue or 0)
                 
-                court_performance[court.name] = {
-                    'total_bookings': len(court_bookings),
-                    'confirmed_bookings': len(court_confirmed),
-                    'revenue': float(court_revenue),
+                court_performance[row.name] = {
+                    'total_bookings': row.total_bookings,
+                    'confirmed_bookings': confirmed,
+                    'revenue': court_revenue,
                     'formatted_revenue': f"${court_revenue:.2f}",
-                    'utilization_rate': float(utilization_rate),
-                    'approval_rate': (len(court_confirmed) / len(court_bookings) * 100) if court_bookings else 0
+                    'utilization_rate': float(confirmed / weeks_in_period),
+                    'approval_rate': (confirmed / row.total_bookings * 100) if row.total_bookings else 0
                 }
             
-            # Weekly breakdown
+            # Calculate metrics
+            total_requests = status_counts['total']
+            approval_rate = (status_counts['confirmed'] / total_requests * 100) if total_requests > 0 else 0
+            cancellation_rate = (status_counts['cancelled'] / total_requests * 100) if total_requests > 0 else 0
+            
+            # Weekly breakdown from confirmed revenue per day
+            daily_confirmed = db.session.query(
+                Booking.booking_date,
+                func.count(Booking.id),
+                func.sum(revenue)
+            ).join(Court).filter(
+                Court.owner_id == owner_id,
+                is_confirmed,
+                Booking.booking_date.between(start_date, end_date)
+            ).group_by(Booking.booking_date).order_by(Booking.booking_date).all()
+            
             weekly_data = defaultdict(lambda: {'bookings': 0, 'revenue': 0.0})
-            for booking in confirmed_bookings:
-                week_start = booking.booking_date - timedelta(days=booking.booking_date.weekday())
-                week_key = week_start.strftime('%Y-%m-%d')
-                weekly_data[week_key]['bookings'] += 1
-                weekly_data[week_key]['revenue'] += booking.total_cost or booking.calculate_cost()
+            for booking_date, day_count, day_revenue in daily_confirmed:
+                week_start = booking_date - timedelta(days=booking_date.weekday())
+                week_key = week_start.isoformat()
+                weekly_data[week_key]['bookings'] += day_count
+                weekly_data[week_key]['revenue'] += float(day_revenue or 0)
             
             return {
                 'success': True,
@@ -253,10 +360,10 @@ class RevenueService:
                 },
                 'booking_statistics': {
                     'total_requests': total_requests,
-                    'confirmed': len(confirmed_bookings),
-                    'pending': len(pending_bookings),
-                    'cancelled': len(cancelled_bookings),
-                    'rejected': len(rejected_bookings),
+                    'confirmed': status_counts['confirmed'],
+                    'pending': status_counts['pending'],
+                    'cancelled': status_counts['cancelled'],
+                    'rejected': status_counts['rejected'],
                     'approval_rate': float(approval_rate),
                     'cancellation_rate': float(cancellation_rate)
                 },
@@ -273,7 +380,7 @@ class RevenueService:
         """Calculate key stats for owner dashboard"""
         try:
             # Get owner's courts
-            courts = Court.query.filter_by(owner_id=owner_id).all()
+            courts = RevenueService.get_owner_courts(owner_id)
             total_courts = len(courts)
             active_courts = len([c for c in courts if c.is_active])
             
@@ -283,16 +390,32 @@ class RevenueService:
             
             # Last 7 days activity
             week_ago = datetime.now() - timedelta(days=7)
-            recent_bookings = db.session.query(Booking).join(Court).filter(
+            recent_bookings = db.session.query(
+                Booking.id,
+                User.full_name.label('player_name'),
+                Court.name.label('court_name'),
+                Booking.booking_date,
+                Booking.start_time,
+                Booking.end_time,
+                Booking.status,
+                func.coalesce(Booking.total_cost, RevenueService.booking_rate_revenue_expression()).label('total_cost'),
+                Booking.created_at
+            ).select_from(Booking).join(Court).join(
+                Player, Booking.player_id == Player.id
+            ).join(
+                User, Player.user_id == User.id
+            ).filter(
                 Court.owner_id == owner_id,
                 Booking.created_at >= week_ago
             ).order_by(Booking.created_at.desc()).limit(10).all()
             
-            # Pending bookings count
-            pending_bookings = db.session.query(Booking).join(Court).filter(
-                Court.owner_id == owner_id,
-                Booking.status == 'pending'
-            ).count()
+            # Pending bookings count - a plain COUNT, without Query.count()'s subquery wrapper
+            pending_bookings = db.session.execute(
+                select(func.count(Booking.id)).select_from(Booking).join(Court).where(
+                    Court.owner_id == owner_id,
+                    Booking.status == 'pending'
+                )
+            ).scalar()
             
             # Unread messages count (from models.message import Message would be needed)
             try:
@@ -309,13 +432,13 @@ class RevenueService:
             for booking in recent_bookings:
                 formatted_bookings.append({
                     'id': booking.id,
-                    'player_name': booking.player.user.full_name,
-                    'court_name': booking.court.name,
+                    'player_name': booking.player_name,
+                    'court_name': booking.court_name,
                     'booking_date': booking.booking_date.strftime('%B %d'),
                     'time_range': f"{booking.start_time.strftime('%H:%M')} - {booking.end_time.strftime('%H:%M')}",
                     'status': booking.status,
-                    'status_color': booking.get_status_color(),
-                    'total_cost': booking.total_cost or booking.calculate_cost(),
+                    'status_color': Booking.color_for_status(booking.status),
+                    'total_cost': booking.total_cost or 0,
                     'created_at': booking.created_at.strftime('%B %d at %H:%M')
                 })
             
@@ -366,22 +489,10 @@ class RevenueService:
                 percentage_change = 100 if current_revenue > 0 else 0
             
             # Determine trend
-            if percentage_change > 10:
-                trend = 'strong_growth'
-                trend_icon = '📈'
-                trend_color = 'success'
-            elif percentage_change > 0:
-                trend = 'growth'
-                trend_icon = '📊'
-                trend_color = 'success'
-            elif percentage_change > -10:
-                trend = 'stable'
-                trend_icon = '📊'
-                trend_color = 'warning'
-            else:
-                trend = 'decline'
-                trend_icon = '📉'
-                trend_color = 'danger'
+            trend, trend_icon, trend_color = next(
+                (name, icon, color) for threshold, name, icon, color in TREND_TABLE
+                if percentage_change > threshold
+            )
             
             return {
                 'success': True,
@@ -2,12 +2,53 @@
 Business Rule Engine for TennisMatchUp
 Centralizes all business logic and validation rules
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date, time
 from models.database import db
 from models.user import User
-from models.player import Player
+from models.player import Player, SKILL_LEVEL_RANKS
 from models.court import Court, Booking
 from models.message import Message
+from sqlalchemy import func, case, select, true
+from sqlalchemy.orm import joinedload, Load
+from utils.db_helpers import query_budget, estimated_count
+from utils.cache import cache, get_or_set, invalidate
+from utils.helpers import validate_email
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1024)
+def _check_time_slots(start_time, end_time):
+    """Business-hours check for parsed times as (valid, reason) - pure, so results are memoized"""
+    if start_time < RuleEngine.OPEN_TIME:
+        return False, f'Booking cannot start before {RuleEngine.OPEN_TIME:%H:%M}'
+    
+    if end_time > RuleEngine.CLOSE_TIME:
+        return False, f'Booking cannot end after {RuleEngine.CLOSE_TIME:%H:%M}'
+    
+    return True, ''
+
+
+@lru_cache(maxsize=4096)
+def _pricing_factors(weekday, is_peak, is_holiday, demand_factor):
+    """Dynamic pricing multipliers in application order - depends only on coarse inputs, so memoized"""
+    factors = []
+    
+    # Weekend surcharge
+    if weekday >= 5:  # Saturday = 5, Sunday = 6
+        factors.append(1.2)
+    
+    # Peak hours surcharge (6-9 PM)
+    if is_peak:
+        factors.append(1.15)
+    
+    # Holiday surcharge
+    if is_holiday:
+        factors.append(1.3)
+    
+    # High demand surcharge
+    factors.append(demand_factor)
+    
+    return tuple(factors)
 
 class RuleEngine:
     """Centralized business rules and validation logic"""
@@ -22,21 +63,73 @@ class RuleEngine:
     MAX_DISTANCE_KM = 50
     MIN_HOURLY_RATE = 10
     MAX_HOURLY_RATE = 500
+    MAX_MESSAGES_PER_HOUR = 50
+    VALID_USER_TYPES = frozenset({'player', 'owner', 'admin'})
+    VALID_SKILL_LEVELS = frozenset({'beginner', 'intermediate', 'advanced', 'professional'})
+    SKILL_LEVEL_RANKS = SKILL_LEVEL_RANKS
+    
+    # Derived thresholds, computed once at import
+    MIN_BOOKING_DURATION_SECONDS = MIN_BOOKING_DURATION_MINUTES * 60
+    MAX_BOOKING_DURATION_SECONDS = MAX_BOOKING_DURATION_HOURS * 3600
+    CANCELLATION_NOTICE = timedelta(hours=CANCELLATION_NOTICE_HOURS)
+    
+    # Business and peak hours, parsed once instead of per call
+    OPEN_TIME = time(6, 0)
+    CLOSE_TIME = time(22, 0)
+    PEAK_START = time(18, 0)
+    PEAK_END = time(21, 0)
+    
+    # Statuses that occupy a court slot
+    ACTIVE_BOOKING_STATUSES = ('confirmed', 'pending')
+    # Hourly slots per day from 8 AM to 9 PM
+    DAILY_SLOTS = 13
+    
+    # Booking status transitions: (current, new) pairs; rejected and cancelled are final
+    STATUS_TRANSITIONS = frozenset({
+        ('pending', 'confirmed'), ('pending', 'rejected'), ('pending', 'cancelled'),
+        ('confirmed', 'cancelled'),
+    })
+    # Owners approve, reject or cancel confirmed bookings; players only cancel their own
+    ROLE_STATUS_TRANSITIONS = frozenset({
+        ('pending', 'confirmed', 'owner'), ('pending', 'rejected', 'owner'),
+        ('confirmed', 'cancelled', 'owner'),
+        ('pending', 'cancelled', 'player'), ('confirmed', 'cancelled', 'player'),
+    })
+    ROLE_RESTRICTED_USER_TYPES = frozenset({'owner', 'player'})
+    
+    # How long check_system_limits counters stay cached
+    SYSTEM_LIMITS_CACHE_SECONDS = 30
+    # How long a user's is_active flag is trusted for message validation
+    USER_ACTIVE_CACHE_SECONDS = 60
+    
+    @staticmethod
+    def parse_date(value):
+        """Parse a YYYY-MM-DD string (date objects pass through); raises ValueError on bad input"""
+        if not isinstance(value, str):
+            return value
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+    
+    @staticmethod
+    def parse_time(value):
+        """Parse an HH:MM string (time objects pass through); raises ValueError on bad input"""
+        if not isinstance(value, str):
+            return value
+        try:
+            return time.fromisoformat(value)
+        except ValueError:
+            # strptime also accepts single-digit hours such as '8:00'
+            return datetime.strptime(value, '%H:%M').time()
     
     @staticmethod
     def validate_user_registration(email, user_type, **kwargs):
         """Validate user registration data"""
         result = {'valid': True, 'reason': ''}
         
-        # Check if email already exists
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
-            result['valid'] = False
-            result['reason'] = 'Email address already registered'
-            return result
-        
         # Validate user type
-        if user_type not in ['player', 'owner', 'admin']:
+        if user_type not in RuleEngine.VALID_USER_TYPES:
             result['valid'] = False
             result['reason'] = 'Invalid user type'
             return result
@@ -44,11 +137,26 @@ class RuleEngine:
         # Additional validation for specific user types
         if user_type == 'player':
             skill_level = kwargs.get('skill_level')
-            if skill_level not in ['beginner', 'intermediate', 'advanced', 'professional']:
+            if skill_level not in RuleEngine.VALID_SKILL_LEVELS:
                 result['valid'] = False
                 result['reason'] = 'Invalid skill level'
                 return result
         
+        # Validate email format
+        if not validate_email(email):
+            result['valid'] = False
+            result['reason'] = 'Invalid email format'
+            return result
+        
+        # Check if email already exists - only after the local checks pass
+        email_taken = db.session.query(
+            db.session.query(User.id).filter_by(email=email).exists()
+        ).scalar()
+        if email_taken:
+            result['valid'] = False
+            result['reason'] = 'Email address already registered'
+            return result
+        
         return result
     
     @staticmethod
@@ -56,23 +164,6 @@ class RuleEngine:
         """Validate court creation"""
         result = {'valid': True, 'reason': ''}
         
-        # Check maximum courts per owner
-        existing_courts = Court.query.filter_by(owner_id=owner_id).count()
-        if existing_courts >= RuleEngine.MAX_COURTS_PER_OWNER:
-            result['valid'] = False
-            result['reason'] = f'Maximum {RuleEngine.MAX_COURTS_PER_OWNER} courts allowed per owner'
-            return result
-        
-        # Check for duplicate court names by same owner
-        duplicate = Court.query.filter_by(
-            owner_id=owner_id,
-            name=name
-        ).first()
-        if duplicate:
-            result['valid'] = False
-            result['reason'] = 'Court name already exists for this owner'
-            return result
-        
         # Validate hourly rate
         if hourly_rate < RuleEngine.MIN_HOURLY_RATE or hourly_rate > RuleEngine.MAX_HOURLY_RATE:
             result['valid'] = False
@@ -90,77 +181,102 @@ class RuleEngine:
             result['reason'] = 'Location must be at least 5 characters long'
             return result
         
+        # Owner's court count and duplicate-name flag in one query
+        existing_courts, duplicate = db.session.query(
+            func.count(Court.id),
+            func.max(case((Court.name == name, 1), else_=0))
+        ).filter(Court.owner_id == owner_id).one()
+        
+        # Check maximum courts per owner
+        if existing_courts >= RuleEngine.MAX_COURTS_PER_OWNER:
+            result['valid'] = False
+            result['reason'] = f'Maximum {RuleEngine.MAX_COURTS_PER_OWNER} courts allowed per owner'
+            return result
+        
+        # Check for duplicate court names by same owner
+        if duplicate:
+            result['valid'] = False
+            result['reason'] = 'Court name already exists for this owner'
+            return result
+        
         return result    
 
     @staticmethod
     def validate_booking(court_id, player_id, booking_date, start_time, end_time, exclude_booking_id=None):
         """Comprehensive booking validation using business rules"""
         
+        # Phase 1: checks that need no database access, so invalid payloads never reach SQL
+        
         # 1. Validate basic requirements
         if not all([court_id, player_id, booking_date, start_time, end_time]):
             return {'valid': False, 'reason': 'All booking fields are required'}
         
-        # 2. Validate court exists and is active
-        from models.court import Court
-        court = Court.query.get(court_id)
-        if not court:
-            return {'valid': False, 'reason': 'Court not found'}
-        if not court.is_active:
-            return {'valid': False, 'reason': 'Court is not available for booking'}
-        
-        # 3. Validate player exists
-        from models.player import Player
-        player = Player.query.get(player_id)
-        if not player:
-            return {'valid': False, 'reason': 'Player not found'}
-        
-        # 4. Validate date is not in the past
-        from datetime import datetime, date
+        # 2. Validate date is not in the past
         try:
-            if isinstance(booking_date, str):
-                booking_date_obj = datetime.strptime(booking_date, '%Y-%m-%d').date()
-            else:
-                booking_date_obj = booking_date
-                
-            if booking_date_obj < date.today():
-                return {'valid': False, 'reason': 'Cannot book courts in the past'}
-                
-            # Check advance booking limit (court's advance_booking_days)
-            days_ahead = (booking_date_obj - date.today()).days
-            if court.advance_booking_days and days_ahead > court.advance_booking_days:
-                return {
-                    'valid': False, 
-                    'reason': f'Cannot book more than {court.advance_booking_days} days in advance'
-                }
-                
+            booking_date = RuleEngine.parse_date(booking_date)
         except ValueError:
             return {'valid': False, 'reason': 'Invalid date format'}
         
-        # 5. Validate time range using business rules
-        if isinstance(start_time, str) and isinstance(end_time, str):
-            time_validation = RuleEngine.validate_booking_time_range(start_time, end_time, player_id)
-            if not time_validation['valid']:
-                return time_validation
-        
-        # 6. Check for booking conflicts
-        conflict_check = RuleEngine.validate_booking_conflicts(
-            court_id, 
-            booking_date if isinstance(booking_date, str) else booking_date.isoformat(),
-            start_time if isinstance(start_time, str) else start_time.strftime('%H:%M'),
-            end_time if isinstance(end_time, str) else end_time.strftime('%H:%M'),
-            exclude_booking_id
-        )
+        # One clock read, so the past-date and advance-limit checks agree even across midnight
+        today = date.today()
+        if booking_date < today:
+            return {'valid': False, 'reason': 'Cannot book courts in the past'}
         
-        if not conflict_check['valid']:
-            return conflict_check
+        # 3. Validate time range using business rules (hours, minimum and maximum duration)
+        time_validation = RuleEngine.validate_booking_time_range(start_time, end_time)
+        if not time_validation['valid']:
+            return time_validation
         
-        # 7. Check player's booking limits (business rule: max 3 pending bookings)
-        from models.court import Booking
-        player_pending_bookings = Booking.query.filter(
+        # Phase 2: database checks
+        
+        # 4. Load court, player, conflict flag and pending count in one round trip
+        conflicts = RuleEngine._conflicting_bookings_query(
+            court_id,
+            booking_date,
+            RuleEngine.parse_time(start_time),
+            RuleEngine.parse_time(end_time),
+            exclude_booking_id
+        )
+        pending_count = select(func.count(Booking.id)).where(
             Booking.player_id == player_id,
             Booking.status == 'pending'
-        ).count()
+        ).scalar_subquery()
+        
+        row = db.session.query(
+            Court, Player, conflicts.exists().label('has_conflict'), pending_count.label('pending_count')
+        ).select_from(Court).join(Player, true()).filter(
+            Court.id == court_id,
+            Player.id == player_id
+        ).one_or_none()
+        
+        if row is None:
+            # Only the failure path needs to know which side is missing
+            court = db.session.get(Court, court_id)
+            if not court:
+                return {'valid': False, 'reason': 'Court not found'}
+            if not court.is_active:
+                return {'valid': False, 'reason': 'Court is not available for booking'}
+            return {'valid': False, 'reason': 'Player not found'}
+        
+        court, player, has_conflict, player_pending_bookings = row
+        if not court.is_active:
+            return {'valid': False, 'reason': 'Court is not available for booking'}
+        
+        # 5. Check advance booking limit (court's advance_booking_days)
+        days_ahead = (booking_date - today).days
+        if court.advance_booking_days and days_ahead > court.advance_booking_days:
+            return {
+                'valid': False, 
+                'reason': f'Cannot book more than {court.advance_booking_days} days in advance'
+            }
         
+        # 6. Check for booking conflicts (the conflicting slots are only fetched for the message)
+        if has_conflict:
+            return RuleEngine.validate_booking_conflicts(
+                court_id, booking_date, start_time, end_time, exclude_booking_id
+            )
+        
+        # 7. Check player's booking limits (business rule: max 3 pending bookings)
         if player_pending_bookings >= 3:
             return {
                 'valid': False, 
@@ -172,15 +288,25 @@ class RuleEngine:
             'valid': True,
             'court': court,
             'player': player,
-            'duration_hours': time_validation.get('duration_hours', 1) if 'time_validation' in locals() else 1
+            'duration_hours': time_validation['duration_hours']
         }
 
     @staticmethod
+    def _load_booking_with_parties(booking_id):
+        """Load a booking with its court and player in one query; any other relationship access raises"""
+        return db.session.query(Booking).options(
+            joinedload(Booking.court),
+            joinedload(Booking.player),
+            Load(Booking).raiseload('*')
+        ).filter(Booking.id == booking_id).one_or_none()
+    
+    @staticmethod
+    @query_budget(1)
     def validate_booking_approval(booking_id, owner_id):
         """Validate booking approval by owner"""
         result = {'valid': True, 'reason': ''}
         
-        booking = Booking.query.get(booking_id)
+        booking = RuleEngine._load_booking_with_parties(booking_id)
         if not booking:
             result['valid'] = False
             result['reason'] = 'Booking not found'
@@ -207,11 +333,12 @@ class RuleEngine:
         return result
     
     @staticmethod
+    @query_budget(1)
     def validate_booking_cancellation(booking_id, user_id, user_type):
         """Validate booking cancellation"""
         result = {'valid': True, 'reason': ''}
         
-        booking = Booking.query.get(booking_id)
+        booking = RuleEngine._load_booking_with_parties(booking_id)
         if not booking:
             result['valid'] = False
             result['reason'] = 'Booking not found'
@@ -228,14 +355,14 @@ class RuleEngine:
             return result
         
         # Check if booking can still be cancelled
-        if booking.status not in ['confirmed', 'pending']:
+        if booking.status not in RuleEngine.ACTIVE_BOOKING_STATUSES:
             result['valid'] = False
             result['reason'] = f'Cannot cancel {booking.status} booking'
             return result
         
         # Check cancellation notice period
         booking_datetime = datetime.combine(booking.booking_date, booking.start_time)
-        notice_cutoff = datetime.now() + timedelta(hours=RuleEngine.CANCELLATION_NOTICE_HOURS)
+        notice_cutoff = datetime.now() + RuleEngine.CANCELLATION_NOTICE
         
         if booking_datetime <= notice_cutoff:
             result['valid'] = False
@@ -257,15 +384,32 @@ class RuleEngine:
             result['reason'] = 'Player not found'
             return result
         
+        return RuleEngine._check_player_matching(player1, player2)
+    
+    @staticmethod
+    def validate_player_matching_bulk(player, candidates):
+        """Validate one loaded player against many loaded candidates, keyed by candidate id (no queries)"""
+        return {
+            candidate.id: RuleEngine._check_player_matching(player, candidate)
+            for candidate in candidates
+        }
+    
+    @staticmethod
+    def _check_player_matching(player1, player2):
+        """Apply matching rules to two loaded players"""
+        result = {'valid': True, 'reason': '', 'compatibility_score': 0}
+        
         # Can't match with yourself
-        if player1_id == player2_id:
+        if player1.id == player2.id:
             result['valid'] = False
             result['reason'] = 'Cannot match with yourself'
             return result
         
         # Check skill level compatibility
-        skill_levels = {'beginner': 1, 'intermediate': 2, 'advanced': 3, 'professional': 4}
-        skill_diff = abs(skill_levels[player1.skill_level] - skill_levels[player2.skill_level])
+        # skill_rank is stored on flush; fall back to the mapping for players not flushed yet
+        rank1 = player1.skill_rank or RuleEngine.SKILL_LEVEL_RANKS[player1.skill_level]
+        rank2 = player2.skill_rank or RuleEngine.SKILL_LEVEL_RANKS[player2.skill_level]
+        skill_diff = abs(rank1 - rank2)
         
         if skill_diff > RuleEngine.MAX_SKILL_LEVEL_DIFFERENCE:
             result['valid'] = False
@@ -311,55 +455,108 @@ class RuleEngine:
             result['reason'] = 'Message too long (max 1000 characters)'
             return result
         
-        # Check if users exist and are active
-        sender = User.query.get(sender_id)
-        receiver = User.query.get(receiver_id)
+        # Check if users exist and are active (cached briefly, so chat bursts don't re-query)
+        active_by_id = RuleEngine._users_active([sender_id, receiver_id])
         
-        if not sender or not sender.is_active:
+        if not active_by_id.get(str(sender_id)):
             result['valid'] = False
             result['reason'] = 'Sender account not valid'
             return result
         
-        if not receiver or not receiver.is_active:
+        if not active_by_id.get(str(receiver_id)):
             result['valid'] = False
             result['reason'] = 'Recipient account not valid'
             return result
         
         # Check rate limiting (max 50 messages per hour per user)
+        # Only "is there an Nth message in the last hour" matters, so probe for that row instead of counting
         hour_ago = datetime.now() - timedelta(hours=1)
-        recent_messages = Message.query.filter(
+        limit_reached = db.session.query(Message.id).filter(
             Message.sender_id == sender_id,
             Message.created_at >= hour_ago
-        ).count()
+        ).order_by(Message.created_at.desc()).offset(RuleEngine.MAX_MESSAGES_PER_HOUR - 1).limit(1).first() is not None
         
-        if recent_messages >= 50:
+        if limit_reached:
             result['valid'] = False
             result['reason'] = 'Message rate limit exceeded. Try again later.'
             return result
         
         return result
     
+    @staticmethod
+    def _users_active(user_ids):
+        """Map str(user_id) -> is_active (False for unknown users), from the cache or one IN query"""
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        keys = [f'rules:user_active:{user_id}' for user_id in ids]
+        active_by_id = {
+            user_id: is_active
+            for user_id, is_active in zip(ids, cache.get_many(*keys))
+            if is_active is not None
+        }
+        
+        missing = [user_id for user_id in ids if user_id not in active_by_id]
+        if missing:
+            # Keyed by str so ids that arrive as JSON strings still match, as with query.get()
+            loaded = {
+                str(user_id): is_active
+                for user_id, is_active in db.session.query(User.id, User.is_active).filter(
+                    User.id.in_(missing)
+                )
+            }
+            for user_id in missing:
+                active_by_id[user_id] = bool(loaded.get(user_id, False))
+            # Unknown ids are not cached, so a user who registers right after a probe can message at once
+            if loaded:
+                cache.set_many(
+                    {f'rules:user_active:{user_id}': bool(is_active) for user_id, is_active in loaded.items()},
+                    timeout=RuleEngine.USER_ACTIVE_CACHE_SECONDS
+                )
+        
+        return active_by_id
+    
+    @staticmethod
+    def invalidate_user_status(user_id):
+        """Drop the cached is_active flag after a user is activated or deactivated"""
+        invalidate(f'rules:user_active:{user_id}')
+    
     @staticmethod
     def calculate_court_recommendation_score(court, player):
         """Calculate recommendation score for a court for a specific player"""
-        score = 100
-        
-        # Location preference (simplified - would use actual distance)
-        if court.location.lower() != player.preferred_location.lower():
-            score -= 30
-        
-        # Price preference (assume players prefer lower prices)
-        if court.hourly_rate > 100:
-            score -= (court.hourly_rate - 100) / 10
-        
-        # Court rating (would be implemented with actual ratings)
-        # score += court.average_rating * 10
-        
-        # Availability (would check actual availability)
-        if not court.is_active:
-            score = 0
+        return RuleEngine.calculate_court_recommendation_scores([court], player)[0]
+    
+    @staticmethod
+    def calculate_court_recommendation_scores(courts, player, court_locations=None):
+        """Recommendation scores for many courts against one player, in the order given
+        
+        court_locations may pass the courts' lowercased locations (same order) when the caller already has them.
+        """
+        preferred_location = player.preferred_location.lower()
+        if court_locations is None:
+            court_locations = [court.location.lower() for court in courts]
+        scores = []
+        
+        for court, court_location in zip(courts, court_locations):
+            # Availability (would check actual availability)
+            if not court.is_active:
+                scores.append(0)
+                continue
+            
+            score = 100
+            
+            # Location preference (simplified - would use actual distance)
+            if court_location != preferred_location:
+                score -= 30
+            
+            # Price preference (assume players prefer lower prices)
+            if court.hourly_rate > 100:
+                score -= (court.hourly_rate - 100) / 10
+            
+            # Court rating (would be implemented with actual ratings)
+            # score += court.average_rating * 10
+            
+            scores.append(max(0, min(100, score)))
         
-        return max(0, min(100, score))
+        return scores
     
     @staticmethod
     def get_business_hours():
@@ -373,53 +570,23 @@ class RuleEngine:
     @staticmethod
     def validate_booking_time_slots(start_time, end_time):
         """Validate booking times are within business hours"""
-        result = {'valid': True, 'reason': ''}
-        
-        business_hours = RuleEngine.get_business_hours()
-        open_time = datetime.strptime(business_hours['open_time'], '%H:%M').time()
-        close_time = datetime.strptime(business_hours['close_time'], '%H:%M').time()
-        
-        if isinstance(start_time, str):
-            start_time = datetime.strptime(start_time, '%H:%M').time()
-        if isinstance(end_time, str):
-            end_time = datetime.strptime(end_time, '%H:%M').time()
-        
-        if start_time < open_time:
-            result['valid'] = False
-            result['reason'] = f'Booking cannot start before {business_hours["open_time"]}'
-            return result
-        
-        if end_time > close_time:
-            result['valid'] = False
-            result['reason'] = f'Booking cannot end after {business_hours["close_time"]}'
-            return result
-        
-        return result
+        valid, reason = _check_time_slots(RuleEngine.parse_time(start_time), RuleEngine.parse_time(end_time))
+        return {'valid': valid, 'reason': reason}
     
     @staticmethod
     def apply_dynamic_pricing(base_rate, booking_date, start_time, **factors):
         """Apply dynamic pricing based on demand and other factors"""
-        final_rate = base_rate
-        
-        # Weekend surcharge
-        if booking_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-            final_rate *= 1.2
-        
-        # Peak hours surcharge (6-9 PM)
-        if isinstance(start_time, str):
-            start_time = datetime.strptime(start_time, '%H:%M').time()
+        start_time = RuleEngine.parse_time(start_time)
         
-        if start_time >= datetime.strptime('18:00', '%H:%M').time() and start_time <= datetime.strptime('21:00', '%H:%M').time():
-            final_rate *= 1.15
-        
-        # Holiday surcharge
-        is_holiday = factors.get('is_holiday', False)
-        if is_holiday:
-            final_rate *= 1.3
-        
-        # High demand surcharge
-        demand_factor = factors.get('demand_factor', 1.0)
-        final_rate *= demand_factor
+        final_rate = base_rate
+        # Applied one at a time, in order, so rounding matches the step-by-step calculation
+        for factor in _pricing_factors(
+            booking_date.weekday(),
+            RuleEngine.PEAK_START <= start_time <= RuleEngine.PEAK_END,
+            bool(factors.get('is_holiday', False)),
+            factors.get('demand_factor', 1.0)
+        ):
+            final_rate *= factor
         
         return round(final_rate, 2)
     
@@ -433,16 +600,32 @@ class RuleEngine:
             'max_messages_per_day': 50000
         }
         
-        current_stats = {
-            'users': User.query.count(),
-            'courts': Court.query.count(),
-            'bookings_today': Booking.query.filter_by(
-                booking_date=datetime.now().date()
-            ).count(),
-            'messages_today': Message.query.filter(
-                Message.created_at >= datetime.now().date()
-            ).count()
-        }
+        today = date.today()
+        start_of_day = datetime.combine(today, time.min)
+        
+        def load_counts():
+            # All four counters as scalar subqueries of a single SELECT; the unbounded
+            # table totals only feed 90% warnings, so planner estimates are enough there
+            users, courts, bookings_today, messages_today = db.session.execute(select(
+                estimated_count(User),
+                estimated_count(Court),
+                select(func.count(Booking.id)).where(Booking.booking_date == today).scalar_subquery(),
+                # created_at is a datetime column, so compare against a datetime bound
+                select(func.count(Message.id)).where(Message.created_at >= start_of_day).scalar_subquery()
+            )).one()
+            return {
+                'users': users,
+                'courts': courts,
+                'bookings_today': bookings_today,
+                'messages_today': messages_today
+            }
+        
+        # Near-real-time is enough for quota warnings
+        current_stats = get_or_set(
+            f'rules:system_counts:{today.isoformat()}',
+            load_counts,
+            timeout=RuleEngine.SYSTEM_LIMITS_CACHE_SECONDS
+        )
         
         warnings = []
         
@@ -460,49 +643,44 @@ class RuleEngine:
     @staticmethod
     def check_court_availability(court_id, date_str):
         """Check court availability for a specific date"""
+        # Only the date can be malformed; validate it up front instead of wrapping the query
         try:
-            from datetime import datetime
-            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            
-            # Get existing bookings
-            from models.court import Booking
-            existing_bookings = Booking.query.filter(
-                Booking.court_id == court_id,
-                Booking.booking_date == target_date,
-                Booking.status.in_(['confirmed', 'pending'])
-            ).count()
-            
-            # Calculate available slots (13 total slots from 8 AM to 9 PM)
-            total_possible_slots = 13
-            available_slots = max(0, total_possible_slots - existing_bookings)
-            
-            return {
-                'available': available_slots > 0,
-                'available_slots': available_slots,
-                'existing_bookings': existing_bookings,
-                'date': target_date.isoformat()
-            }
-            
-        except Exception as e:
+            target_date = RuleEngine.parse_date(date_str)
+            if not isinstance(target_date, date):
+                raise ValueError('Date is required')
+        except ValueError as e:
             return {
                 'available': False,
                 'available_slots': 0,
                 'existing_bookings': 0,
                 'error': str(e)
             }
+        
+        existing_bookings = db.session.query(func.count(Booking.id)).filter(
+            Booking.court_id == court_id,
+            Booking.booking_date == target_date,
+            Booking.status.in_(RuleEngine.ACTIVE_BOOKING_STATUSES)
+        ).scalar()
+        
+        available_slots = max(0, RuleEngine.DAILY_SLOTS - existing_bookings)
+        
+        return {
+            'available': available_slots > 0,
+            'available_slots': available_slots,
+            'existing_bookings': existing_bookings,
+            'date': target_date.isoformat()
+        }
 
     @staticmethod
     def validate_booking_time_range(start_time_str, end_time_str):
         """Validate booking time range meets business rules"""
         try:
-            from datetime import datetime, time
-            
-            start_time = datetime.strptime(start_time_str, '%H:%M').time()
-            end_time = datetime.strptime(end_time_str, '%H:%M').time()
+            start_time = RuleEngine.parse_time(start_time_str)
+            end_time = RuleEngine.parse_time(end_time_str)
             
             # Business rules for time validation
-            opening_time = time(6, 0)   # 6 AM
-            closing_time = time(22, 0)  # 10 PM
+            opening_time = RuleEngine.OPEN_TIME   # 6 AM
+            closing_time = RuleEngine.CLOSE_TIME  # 10 PM
             
             # Check operating hours
             if start_time < opening_time or end_time > closing_time:
@@ -511,19 +689,20 @@ class RuleEngine:
                     'reason': f'Court operates from {opening_time.strftime("%I:%M %p")} to {closing_time.strftime("%I:%M %p")}'
                 }
             
-            # Check minimum duration (1 hour)
-            start_datetime = datetime.combine(datetime.today(), start_time)
-            end_datetime = datetime.combine(datetime.today(), end_time)
-            duration_hours = (end_datetime - start_datetime).total_seconds() / 3600
+            # Check minimum duration (1 hour) - whole seconds, no float division
+            duration_seconds = (
+                (end_time.hour * 3600 + end_time.minute * 60 + end_time.second)
+                - (start_time.hour * 3600 + start_time.minute * 60 + start_time.second)
+            )
             
-            if duration_hours < 1:
+            if duration_seconds < RuleEngine.MIN_BOOKING_DURATION_SECONDS:
                 return {
                     'valid': False,
                     'reason': 'Minimum booking duration is 1 hour'
                 }
             
             # Check maximum duration (4 hours)
-            if duration_hours > 4:
+            if duration_seconds > RuleEngine.MAX_BOOKING_DURATION_SECONDS:
                 return {
                     'valid': False,
                     'reason': 'Maximum booking duration is 4 hours'
@@ -531,7 +710,7 @@ class RuleEngine:
             
             return {
                 'valid': True,
-                'duration_hours': duration_hours
+                'duration_hours': duration_seconds / 3600
             }
             
         except ValueError:
@@ -540,6 +719,26 @@ class RuleEngine:
                 'reason': 'Invalid time format'
             }
 
+    @staticmethod
+    def _conflicting_bookings_query(court_id, booking_date, start_time, end_time, exclude_booking_id=None):
+        """Active bookings on the court overlapping the given (already parsed) slot"""
+        conflicts_query = db.session.query(
+            Booking.id, Booking.start_time, Booking.end_time
+        ).filter(
+            Booking.court_id == court_id,
+            Booking.booking_date == booking_date,
+            Booking.status.in_(RuleEngine.ACTIVE_BOOKING_STATUSES),
+            # Check for time overlap
+            Booking.start_time < end_time,
+            Booking.end_time > start_time
+        )
+        
+        # Exclude current booking if editing
+        if exclude_booking_id:
+            conflicts_query = conflicts_query.filter(Booking.id != exclude_booking_id)
+        
+        return conflicts_query
+    
     @staticmethod
     def validate_booking_conflicts(court_id, booking_date_str, start_time_str, end_time_str, exclude_booking_id=None):
         """Check for booking conflicts with existing bookings"""
@@ -547,24 +746,15 @@ class RuleEngine:
             from datetime import datetime
             from models.court import Booking
             
-            booking_date = datetime.strptime(booking_date_str, '%Y-%m-%d').date()
-            start_time = datetime.strptime(start_time_str, '%H:%M').time()
-            end_time = datetime.strptime(end_time_str, '%H:%M').time()
+            booking_date = RuleEngine.parse_date(booking_date_str)
+            start_time = RuleEngine.parse_time(start_time_str)
+            end_time = RuleEngine.parse_time(end_time_str)
             
-            # Query for conflicting bookings
-            conflicts_query = Booking.query.filter(
-                Booking.court_id == court_id,
-                Booking.booking_date == booking_date,
-                Booking.status.in_(['confirmed', 'pending']),
-                # Check for time overlap
-                Booking.start_time < end_time,
-                Booking.end_time > start_time
+            # Query for conflicting bookings - only the times are needed for the message
+            conflicts_query = RuleEngine._conflicting_bookings_query(
+                court_id, booking_date, start_time, end_time, exclude_booking_id
             )
             
-            # Exclude current booking if editing
-            if exclude_booking_id:
-                conflicts_query = conflicts_query.filter(Booking.id != exclude_booking_id)
-            
             conflicts = conflicts_query.all()
             
             if conflicts:
@@ -591,41 +781,18 @@ class RuleEngine:
         """Validate booking status change based on business rules"""
         result = {'valid': True, 'reason': ''}
         
-        # Valid status transitions
-        valid_transitions = {
-            'pending': ['confirmed', 'rejected', 'cancelled'],
-            'confirmed': ['cancelled'],
-            'rejected': [],  # Final state
-            'cancelled': []  # Final state
-        }
-        
         # Check if transition is allowed
-        if new_status not in valid_transitions.get(current_status, []):
+        if (current_status, new_status) not in RuleEngine.STATUS_TRANSITIONS:
             result['valid'] = False
             result['reason'] = f'Cannot change from {current_status} to {new_status}'
             return result
         
-        # User type specific validations
-        if user_type == 'owner':
-            # Owners can approve (pending->confirmed) and reject (pending->rejected)
-            if current_status == 'pending' and new_status in ['confirmed', 'rejected']:
-                result['valid'] = True
-            # Owners can cancel confirmed bookings
-            elif current_status == 'confirmed' and new_status == 'cancelled':
-                result['valid'] = True
-            else:
-                result['valid'] = False
-                result['reason'] = f'Owners cannot change booking from {current_status} to {new_status}'
-                return result
-        
-        elif user_type == 'player':
-            # Players can only cancel their own bookings
-            if new_status == 'cancelled' and current_status in ['pending', 'confirmed']:
-                result['valid'] = True
-            else:
-                result['valid'] = False
-                result['reason'] = f'Players cannot change booking from {current_status} to {new_status}'
-                return result
+        # User type specific validations (other user types may make any valid transition)
+        if user_type in RuleEngine.ROLE_RESTRICTED_USER_TYPES and \
+                (current_status, new_status, user_type) not in RuleEngine.ROLE_STATUS_TRANSITIONS:
+            result['valid'] = False
+            result['reason'] = f'{user_type.capitalize()}s cannot change booking from {current_status} to {new_status}'
+            return result
         
         # Additional business rule validations
         if booking_id and new_status == 'confirmed':
@@ -217,6 +217,7 @@ class UserService:
                 pass
             
             db.session.commit()
+            RuleEngine.invalidate_user_status(user.id)
             
             return {
                 'success': True,
@@ -239,6 +240,7 @@ class UserService:
             user.updated_at = datetime.utcnow()
             
             db.session.commit()
+            RuleEngine.invalidate_user_status(user.id)
             
             return {
                 'success': True,
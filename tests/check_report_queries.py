@@ -0,0 +1,58 @@
+# check_report_queries.py - בדיקת מספר השאילתות בדוחות (מניעת N+1)
+
+import sys
+
+from app import create_app
+
+# Upper bound on SQL statements per report, independent of how many users/bookings exist
+QUERY_BUDGETS = {
+    'generate_admin_dashboard_stats': 5,
+    'create_user_activity_report': 8,
+    'system_performance_metrics': 8,
+}
+
+
+def check_report_queries():
+    """Run each report uncached and fail if it issues more queries than its budget"""
+    app = create_app()
+
+    with app.app_context():
+        from services.report_service import ReportService
+        from utils.db_helpers import count_queries
+
+        reports = {
+            'generate_admin_dashboard_stats': ReportService.generate_admin_dashboard_stats,
+            'create_user_activity_report': ReportService.create_user_activity_report,
+            'system_performance_metrics': ReportService.system_performance_metrics,
+        }
+
+        print("📊 TennisMatchUp - Report Query Count Check")
+        print("=" * 50)
+
+        all_ok = True
+        for name, report in reports.items():
+            # Start from a cold cache so the real query count is measured
+            ReportService.invalidate_report_caches()
+
+            with count_queries() as queries:
+                result = report()
+
+            budget = QUERY_BUDGETS[name]
+            ok = result.get('success') and len(queries) <= budget
+            status = "✅" if ok else "❌"
+            print(f"  {status} {name}: {len(queries)} queries (budget {budget})")
+
+            if not result.get('success'):
+                print(f"     Error: {result.get('error')}")
+            elif len(queries) > budget:
+                for statement in queries:
+                    print(f"     • {' '.join(statement.split())[:120]}")
+
+            all_ok = all_ok and ok
+
+        print("\n✅ All reports within budget" if all_ok else "\n🚨 Report query budget exceeded")
+        return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_report_queries() else 1)
@@ -0,0 +1,45 @@
+"""
+In-process caching helpers for expensive read paths
+Uses Redis instead when REDIS_URL is set and the redis package is installed
+"""
+import os
+from cachelib import SimpleCache
+
+
+def _create_cache():
+    """Build the shared cache backend (Redis is optional)"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            from cachelib import RedisCache
+            return RedisCache(host=redis.Redis.from_url(redis_url), key_prefix='tennismatchup:',
+                              default_timeout=300)
+        except ImportError:
+            pass
+    return SimpleCache(threshold=2048, default_timeout=300)
+
+
+# Shared short-lived cache for aggregate lookups (values must be plain data, never ORM objects)
+cache = _create_cache()
+
+
+def get_or_set(key, loader, timeout=None):
+    """Return cached value for key, calling loader() and caching its result on a miss"""
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, timeout=timeout)
+    return value
+
+
+def adjust_counter(key, delta):
+    """Add delta to a cached integer counter, leaving it unset if it is not cached yet"""
+    if delta and cache.has(key):
+        cache.inc(key, delta)
+
+
+def invalidate(*keys):
+    """Drop one or more cache keys"""
+    if keys:
+        cache.delete_many(*keys)
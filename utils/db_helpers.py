@@ -3,7 +3,10 @@ Database helper utilities for connection management
 """
 import time
 import logging
+from contextlib import contextmanager
 from functools import wraps
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, case, select, cast, table, column, BigInteger
 from sqlalchemy.exc import OperationalError, DisconnectionError
 from models.database import db
 
@@ -59,4 +62,72 @@ def safe_db_operation(operation_func, fallback_value=None):
         return fallback_value
     except Exception as e:
         logger.error(f"Unexpected database error: {str(e)}")
-        raise e
\ No newline at end of file
+        raise e
+
+def count_where(column, condition):
+    """
+    COUNT(column) FILTER (WHERE condition), falling back to SUM(CASE ...) where FILTER is unsupported
+    """
+    if db.engine.dialect.name in ('postgresql', 'sqlite'):
+        return func.count(column).filter(condition)
+    return func.sum(case((condition, 1), else_=0))
+
+def estimated_count(model):
+    """
+    Row count of a model's table as a scalar subquery - PostgreSQL's planner estimate
+    (pg_class.reltuples, O(1)) with an exact COUNT(*) on other backends or before the table is analyzed
+    """
+    exact = select(func.count()).select_from(model.__table__).scalar_subquery()
+    if db.engine.dialect.name != 'postgresql':
+        return exact
+    
+    pg_class = table('pg_class', column('oid'), column('reltuples'))
+    estimate = select(cast(pg_class.c.reltuples, BigInteger)).where(
+        pg_class.c.oid == func.to_regclass(model.__tablename__)
+    ).scalar_subquery()
+    # reltuples is -1 until the first VACUUM/ANALYZE
+    return case((estimate >= 0, estimate), else_=exact)
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Collect every SQL statement executed inside the block (used to catch N+1 regressions)
+    
+    Usage:
+        with count_queries() as queries:
+            ReportService.generate_admin_dashboard_stats()
+        assert len(queries) <= 5
+    """
+    engine = engine or db.engine
+    queries = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def query_budget(max_queries):
+    """
+    Decorator that logs a warning in debug mode when the wrapped call runs more than max_queries statements
+    """
+    def decorator(operation):
+        @wraps(operation)
+        def wrapper(*args, **kwargs):
+            if not (has_app_context() and current_app.debug):
+                return operation(*args, **kwargs)
+            
+            with count_queries() as queries:
+                result = operation(*args, **kwargs)
+            
+            if len(queries) > max_queries:
+                logger.warning(
+                    f"{operation.__qualname__} ran {len(queries)} queries (budget {max_queries})"
+                )
+            return result
+            
+        return wrapper
+    return decorator
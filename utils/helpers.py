@@ -5,12 +5,14 @@ Only the essential functions to avoid import errors
 import re
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Compiled once; shared by registration routes and RuleEngine (domain labels may not be empty, so no "x..com")
+_EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}')
+
 def validate_email(email):
     """Validate email address format"""
     if not email:
         return False
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_PATTERN.fullmatch(email) is not None
 
 def validate_phone(phone):
     """Validate phone number format"""